@@ -0,0 +1,40 @@
+from typing import List, Optional
+
+from django import template
+
+register = template.Library()
+
+ON_EACH_SIDE: int = 2
+ON_ENDS: int = 1
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side: int = ON_EACH_SIDE,
+                on_ends: int = ON_ENDS) -> List[Optional[int]]:
+    """
+    Page numbers around the current one with the first and last pages.
+
+    None stands for the skipped pages. Only the shown numbers are built,
+    so the window costs the same for any number of pages.
+    """
+    number: int = page_obj.number
+    last: int = page_obj.paginator.num_pages
+
+    if last <= (on_each_side + on_ends) * 2 + 1:
+        return list(range(1, last + 1))
+
+    pages: List[Optional[int]] = []
+    start: int = 1
+    if number > on_each_side + on_ends + 1:
+        pages.extend(range(1, on_ends + 1))
+        pages.append(None)
+        start = number - on_each_side
+
+    if number < last - on_each_side - on_ends:
+        pages.extend(range(start, number + on_each_side + 1))
+        pages.append(None)
+        pages.extend(range(last - on_ends + 1, last + 1))
+    else:
+        pages.extend(range(start, last + 1))
+
+    return pages
@@ -1,8 +1,11 @@
 from http import HTTPStatus
 
 from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.test import TestCase
 
+from .templatetags.paginator_tags import page_window
+
 
 class ViewTestClass(TestCase):
     def setUp(self) -> None:
@@ -12,3 +15,29 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class PageWindowTests(TestCase):
+    def test_page_window(self):
+        """Window keeps the ends and the pages around the current one."""
+        paginator = Paginator(range(1000), 10)
+        windows = {
+            1: [1, 2, 3, None, 100],
+            4: [1, 2, 3, 4, 5, 6, None, 100],
+            50: [1, None, 48, 49, 50, 51, 52, None, 100],
+            100: [1, None, 98, 99, 100],
+        }
+
+        for number, window in windows.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    page_window(paginator.page(number)), window
+                )
+
+    def test_short_range_is_not_elided(self):
+        """All pages are shown while they fit into the window."""
+        paginator = Paginator(range(70), 10)
+
+        self.assertEqual(
+            page_window(paginator.page(4)), [1, 2, 3, 4, 5, 6, 7]
+        )
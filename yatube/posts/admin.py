@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import CensoredWord, Comment, Follow, Group, Post
+from .models import (CensoredWord, Comment, Follow, Group, ModerationTask,
+                     Post)
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,12 +12,13 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date',
         'author',
         'group',
+        'status',
     )
     list_editable = ('group',)
     # Fields for search
     search_fields = ('text',)
     # Filters
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'status')
     empty_value_display = '-пусто-'
 
 
@@ -33,7 +35,7 @@ class CensoredWordAdmin(admin.ModelAdmin):
 
 
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'post', 'author', 'text', 'created')
+    list_display = ('pk', 'post', 'author', 'text', 'created', 'status')
     search_fields = ('post', 'author', 'text')
     empty_value_display = '-пусто-'
 
@@ -44,6 +46,20 @@ class FollowAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class ModerationTaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'post', 'comment', 'created', 'attempts',
+                    'claimed_at')
+    list_filter = ('attempts',)
+    actions = ('requeue',)
+    empty_value_display = '-пусто-'
+
+    def requeue(self, request, queryset):
+        # Tasks which failed too many times are taken by the worker again.
+        queryset.update(attempts=0, claimed_at=None)
+
+    requeue.short_description = 'Вернуть в очередь'
+
+
 admin.site.register(Post, PostAdmin)
 
 admin.site.register(Group, GroupAdmin)
@@ -53,3 +69,5 @@ admin.site.register(CensoredWord, CensoredWordAdmin)
 admin.site.register(Comment, CommentAdmin)
 
 admin.site.register(Follow, FollowAdmin)
+
+admin.site.register(ModerationTask, ModerationTaskAdmin)
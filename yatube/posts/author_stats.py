@@ -0,0 +1,89 @@
+"""Numbers of posts and follows of authors, stored in AuthorStats."""
+from typing import Dict, Iterator, List
+
+from django.db.models import Count, F
+
+from .models import AuthorStats, Follow, Post, User
+
+POST_COUNT: str = 'post_count'
+FOLLOWER_COUNT: str = 'follower_count'
+FOLLOWING_COUNT: str = 'following_count'
+FIELDS: List[str] = [POST_COUNT, FOLLOWER_COUNT, FOLLOWING_COUNT]
+BATCH_SIZE: int = 1000
+
+
+def _grouped(queryset, field: str, user_ids: List[int]) -> Dict[int, int]:
+    return dict(
+        queryset.filter(**{f'{field}__in': user_ids})
+        .values_list(field).annotate(count=Count('pk')).order_by()
+    )
+
+
+def count_stats(user_ids: List[int]) -> Dict[int, AuthorStats]:
+    """Stats of the users counted from scratch."""
+    counts: Dict[str, Dict[int, int]] = {
+        POST_COUNT: _grouped(Post.objects, 'author_id', user_ids),
+        FOLLOWER_COUNT: _grouped(Follow.objects, 'author_id', user_ids),
+        FOLLOWING_COUNT: _grouped(Follow.objects, 'user_id', user_ids),
+    }
+
+    return {
+        pk: AuthorStats(
+            user_id=pk,
+            **{field: counts[field].get(pk, 0) for field in FIELDS}
+        )
+        for pk in user_ids
+    }
+
+
+def change_stats(user_id: int, field: str, delta: int) -> None:
+    """
+    Add delta to the counter of the user in the database.
+
+    A missing row is counted from scratch on an increment. Decrements
+    do not go below zero; a drift is repaired by reconcile_author_stats.
+    """
+    stats = AuthorStats.objects.filter(user_id=user_id)
+    if delta < 0:
+        stats = stats.filter(**{f'{field}__gte': -delta})
+
+    updated: int = stats.update(**{field: F(field) + delta})
+    if not updated and delta > 0:
+        # Users deleted in the same transaction take their stats along.
+        if User.objects.filter(pk=user_id).exists():
+            AuthorStats.objects.bulk_create(
+                count_stats([user_id]).values(), ignore_conflicts=True
+            )
+
+
+def reconcile(batch_size: int = BATCH_SIZE) -> Iterator[int]:
+    """Recount the stats of all users in batches, yield repaired numbers."""
+    users = User.objects.order_by('pk').values_list('pk', flat=True)
+    after_id: int = 0
+
+    while True:
+        user_ids: List[int] = list(
+            users.filter(pk__gt=after_id)[:batch_size]
+        )
+        if not user_ids:
+            return
+
+        counted: Dict[int, AuthorStats] = count_stats(user_ids)
+        stored: Dict[int, AuthorStats] = AuthorStats.objects.in_bulk(
+            user_ids
+        )
+        missing: List[AuthorStats] = [
+            stats for pk, stats in counted.items() if pk not in stored
+        ]
+        drifted: List[AuthorStats] = [
+            stats for pk, stats in counted.items()
+            if pk in stored and any(
+                getattr(stats, field) != getattr(stored[pk], field)
+                for field in FIELDS
+            )
+        ]
+        AuthorStats.objects.bulk_create(missing, ignore_conflicts=True)
+        AuthorStats.objects.bulk_update(drifted, FIELDS)
+
+        yield len(missing) + len(drifted)
+        after_id = user_ids[-1]
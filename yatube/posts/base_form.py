@@ -1,32 +1,32 @@
-from typing import Tuple
+from typing import Sequence, Tuple
 
 from django import forms
 
-from .models import CensoredWord
-from .utils import bad_language_validation
-
-SIMILARITY_THRESHOLD: float = 0.9
+from .censor import find_bad_spans
+from .moderation import is_deferred
+from .utils import mask_spans
 
 
 class BaseForm(forms.ModelForm):
+    # Offsets of censored words in the last checked text.
+    censored_spans: Sequence[Tuple[int, int]] = ()
+
     def clean_text(self):
         text: str = self.cleaned_data['text']
-        stop_words = CensoredWord.objects.values_list('word', flat=True)
 
-        data: Tuple[str, bool] = bad_language_validation(
-            text,
-            stop_words,
-            SIMILARITY_THRESHOLD
-        )
+        # The moderation worker will check the text after it is saved.
+        if is_deferred():
+            return text
+
+        previous_text = self.instance.text if self.instance.pk else None
 
-        text = data[0]
-        validation_error = data[1]
+        self.censored_spans = find_bad_spans(text, previous_text)
 
-        if validation_error:
+        if self.censored_spans:
             raise forms.ValidationError(
                 ('Пожалуйста, исправьте слова, что '
                  'отмечены звёздочками: %(value)s'),
                 code='invalid',
-                params={'value': text})
+                params={'value': mask_spans(text, self.censored_spans)})
 
         return text
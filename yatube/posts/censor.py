@@ -0,0 +1,231 @@
+"""Process-wide censor state shared by all forms."""
+import gc
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+from .censor_index import CensorIndex, load_index
+from .models import CensoredWord, CensoredWordForm
+from .stats import stats
+from .utils import (MIN_INFIX_LENGTH, CallTimings, CensorMatcher,
+                    collect_timings, get_english_stemmer,
+                    get_morph_analyzer, get_stemmer, inflect_word,
+                    normalize_words, stage, word_tokenize)
+
+SIMILARITY_THRESHOLD: float = 0.9
+FUZZY_ENGINE: str = 'index'
+VERDICT_TIMEOUT: int = 60 * 60 * 24
+VERSION_TTL: float = 5.0
+VERDICT_KEY: str = 'censor:verdict:{version}:{digest}'
+WARM_UP_TEXT: str = 'Охотники вышли из леса.'
+
+logger = logging.getLogger('posts.censor')
+
+_lock = threading.Lock()
+_matcher: Optional[Tuple[str, CensorMatcher]] = None
+_version: Optional[Tuple[float, str]] = None
+_generation: int = 0
+
+
+def _read_version() -> str:
+    digest = hashlib.sha256()
+    for pk, word in CensoredWord.objects.order_by('pk').values_list(
+        'pk', 'word'
+    ).iterator():
+        digest.update(f'{pk} {word}\n'.encode())
+
+    return digest.hexdigest()[:16]
+
+
+def get_version() -> str:
+    """
+    Return the version of the stop list, the same in all processes.
+
+    The version is a digest of the stop list in the database, read again
+    after CENSOR_VERSION_TTL seconds, so a word changed through one
+    process reaches the others without a shared cache.
+    """
+    global _version
+
+    checked_at: float = time.monotonic()
+    ttl: float = getattr(settings, 'CENSOR_VERSION_TTL', VERSION_TTL)
+    with _lock:
+        if _version is not None and checked_at - _version[0] < ttl:
+            return _version[1]
+
+    version: str = _read_version()
+    with _lock:
+        _version = (checked_at, version)
+
+    return version
+
+
+def get_matcher_options() -> Dict[str, Any]:
+    """Matcher settings shared by the forms and the commands."""
+    return {
+        'min_infix_length': getattr(
+            settings, 'CENSOR_MIN_INFIX_LENGTH', MIN_INFIX_LENGTH
+        ),
+        'fuzzy_engine': getattr(settings, 'CENSOR_FUZZY_ENGINE', FUZZY_ENGINE),
+    }
+
+
+def build_matcher() -> CensorMatcher:
+    """Compile the stop list, loading it from the index file if it is fresh."""
+    stop_words: List[str] = list(
+        CensoredWord.objects.values_list('word', flat=True)
+    )
+    index: Optional[CensorIndex] = load_index(stop_words)
+
+    if index is not None:
+        return CensorMatcher.from_stop_phrases(
+            index.stop_phrases,
+            SIMILARITY_THRESHOLD,
+            word_forms=index.word_forms,
+            **get_matcher_options()
+        )
+
+    return CensorMatcher(
+        stop_words,
+        SIMILARITY_THRESHOLD,
+        word_forms=CensoredWordForm.objects.values_list('form', 'stem'),
+        **get_matcher_options()
+    )
+
+
+def get_matcher(version: Optional[str] = None) -> CensorMatcher:
+    """Return the compiled matcher, building it on first use."""
+    global _matcher
+
+    if version is None:
+        version = get_version()
+
+    with _lock:
+        if _matcher is not None and _matcher[0] == version:
+            return _matcher[1]
+        generation = _generation
+
+    matcher = build_matcher()
+
+    with _lock:
+        # Keep the result only if the stop list has not changed meanwhile.
+        if generation == _generation:
+            _matcher = (version, matcher)
+
+    return matcher
+
+
+def invalidate_matcher() -> None:
+    """Forget the compiled matcher and the version of the stop list."""
+    global _matcher, _version, _generation
+
+    with _lock:
+        _generation += 1
+        _matcher = None
+        _version = None
+
+
+def warm_up() -> None:
+    """
+    Load the dictionaries and build the matcher before workers fork.
+
+    Workers forked after this share the loaded pages copy-on-write
+    instead of loading their own copies on the first check. Database
+    connections are closed, so every worker opens its own.
+    """
+    if not getattr(settings, 'CENSOR_WARM_UP', True):
+        return
+
+    get_morph_analyzer()
+    get_stemmer()
+    if getattr(settings, 'CENSOR_ENGLISH_STEMMER', False):
+        get_english_stemmer()
+    normalize_words(word_tokenize(WARM_UP_TEXT))
+
+    try:
+        get_matcher()
+    except DatabaseError:
+        # The stop list is loaded on the first check instead.
+        logger.warning('Censor matcher is not built, database is not ready.')
+    finally:
+        # A connection inherited by forked workers would be shared by them.
+        connections.close_all()
+
+    # Keep the collector from writing to the shared objects in workers.
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def _verdict_key(version: str, text: str) -> str:
+    return VERDICT_KEY.format(
+        version=version,
+        digest=hashlib.sha256(text.encode()).hexdigest()
+    )
+
+
+def timed_find_bad_spans(matcher: CensorMatcher, text: str,
+                         clean_text: Optional[str] = None
+                         ) -> Tuple[List[Tuple[int, int]], CallTimings]:
+    """Check the text, recording timings of every stage into stats."""
+    with collect_timings() as timings, stage('total'):
+        if clean_text is None:
+            spans = matcher.find_bad_spans(text)
+        else:
+            spans = matcher.find_changed_bad_spans(clean_text, text)
+
+    stats.record(timings, len(text), matcher.stop_words_count)
+
+    return spans, timings
+
+
+def find_bad_spans(text: str,
+                   previous_text: Optional[str] = None
+                   ) -> List[Tuple[int, int]]:
+    """
+    Return offsets of bad words, reusing verdicts for the same text.
+
+    If previous_text of the edited object passed the check under the
+    current stop list, only the changed words of the text are checked.
+    """
+    version: str = get_version()
+    key: str = _verdict_key(version, text)
+    spans = cache.get(key)
+
+    if spans is not None:
+        return spans
+
+    if (previous_text is not None
+            and cache.get(_verdict_key(version, previous_text)) != []):
+        previous_text = None
+
+    spans, _ = timed_find_bad_spans(
+        get_matcher(version), text, previous_text
+    )
+
+    cache.set(
+        key,
+        spans,
+        getattr(settings, 'CENSOR_VERDICT_TIMEOUT', VERDICT_TIMEOUT)
+    )
+
+    return spans
+
+
+def store_word_forms(censored_word: CensoredWord) -> None:
+    """Save inflected forms of the censored word for fast lookups."""
+    censored_word.forms.all().delete()
+
+    # Phrases are matched by stems, only single words are expanded.
+    if len(word_tokenize(censored_word.word)) != 1:
+        return
+
+    CensoredWordForm.objects.bulk_create(
+        CensoredWordForm(word=censored_word, form=form, stem=stem)
+        for form, stem in inflect_word(censored_word.word)
+    )
@@ -0,0 +1,242 @@
+"""
+Compiled stop list saved to a file shared by all processes.
+
+The file holds the normalized stop phrases and the inflected forms of stop
+words with their stems. Forms are looked up through an open addressing
+hash table right in the memory-mapped file, so all processes share one
+physical copy of them.
+
+Layout: header, sections of phrases, forms and stems, then the table.
+A section is the number of strings, their offsets as native unsigned ints
+and the UTF-8 blob padded to keep the next offsets aligned. The table is
+a power of two of slots, each holding the form number plus one or zero.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+MAGIC: bytes = b'YCENSIDX'
+FORMAT_VERSION: int = 1
+# Share of the table slots in use, lower means shorter probe sequences.
+TABLE_LOAD: float = 0.5
+# Offsets are written in the native layout, a foreign file is rebuilt.
+BYTE_ORDER_MARK: bytes = array('I', [1]).tobytes()
+OFFSET_SIZE: int = len(BYTE_ORDER_MARK)
+HEADER = struct.Struct(f'<8sI{OFFSET_SIZE}s32s')
+COUNT = struct.Struct('<I')
+
+logger = logging.getLogger('posts.censor')
+
+
+def _padded(size: int) -> int:
+    return -(-size // OFFSET_SIZE) * OFFSET_SIZE
+
+
+class CensorIndexError(Exception):
+    """Index file is missing, damaged or written by another version."""
+
+
+def stop_list_digest(stop_words: Iterable[str]) -> bytes:
+    """Digest of everything the normalized stop list depends on."""
+    digest = hashlib.sha256()
+    digest.update(str(FORMAT_VERSION).encode())
+    digest.update(
+        str(getattr(settings, 'CENSOR_ENGLISH_STEMMER', False)).encode()
+    )
+    for stop_word in sorted(set(stop_words)):
+        digest.update(stop_word.encode() + b'\n')
+
+    return digest.digest()
+
+
+def _pack_section(strings: Sequence[str]) -> bytes:
+    blobs: List[bytes] = [string.encode() for string in strings]
+    offsets = array('I', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    blob: bytes = b''.join(blobs)
+
+    return b''.join((
+        COUNT.pack(len(blobs)),
+        offsets.tobytes(),
+        blob.ljust(_padded(len(blob)), b'\0'),
+    ))
+
+
+def _pack_table(forms: Sequence[bytes]) -> bytes:
+    size: int = 1
+    while size * TABLE_LOAD < len(forms):
+        size *= 2
+    slots = array('I', [0]) * size
+
+    for number, form in enumerate(forms):
+        slot: int = zlib.crc32(form) & (size - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (size - 1)
+        slots[slot] = number + 1
+
+    return COUNT.pack(size) + slots.tobytes()
+
+
+def write_index(path: str, digest: bytes,
+                stop_phrases: Iterable[Sequence[str]],
+                word_forms: Iterable[Tuple[str, str]]) -> int:
+    """Write the index atomically, return the size of the file."""
+    forms: List[Tuple[str, str]] = list(dict(word_forms).items())
+    data: bytes = b''.join((
+        HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, digest),
+        _pack_section([' '.join(phrase) for phrase in stop_phrases]),
+        _pack_section([form for form, _ in forms]),
+        _pack_section([stem for _, stem in forms]),
+        _pack_table([form.encode() for form, _ in forms]),
+    ))
+
+    # Processes mapping the old file keep reading it till they reopen.
+    directory: str = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as index_file:
+            index_file.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return len(data)
+
+
+class _Section:
+    """Strings of one section read from the mapped file on demand."""
+
+    def __init__(self, buffer: memoryview, position: int):
+        self._buffer = buffer
+        (self.count,) = COUNT.unpack_from(buffer, position)
+        position += COUNT.size
+        end: int = position + (self.count + 1) * OFFSET_SIZE
+        self._offsets = buffer[position:end].cast('I')
+        self._start: int = end
+        self.end: int = end + _padded(self._offsets[self.count])
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._buffer[
+            self._start + self._offsets[i]:self._start + self._offsets[i + 1]
+        ].tobytes()
+
+
+class _Table:
+    """Hash table of the strings of a section."""
+
+    def __init__(self, buffer: memoryview, position: int, section: _Section):
+        self._section = section
+        (self._size,) = COUNT.unpack_from(buffer, position)
+        position += COUNT.size
+        self.end: int = position + self._size * OFFSET_SIZE
+        self._slots = buffer[position:self.end].cast('I')
+        if self._size & (self._size - 1):
+            raise ValueError('table size is not a power of two')
+
+    def find(self, key: bytes) -> int:
+        """Number of the string equal to the key or -1."""
+        mask: int = self._size - 1
+        slot: int = zlib.crc32(key) & mask
+
+        for _ in range(self._size):
+            number: int = self._slots[slot]
+            if not number:
+                break
+            if self._section[number - 1] == key:
+                return number - 1
+            slot = (slot + 1) & mask
+
+        return -1
+
+
+class MappedWordForms(Mapping):
+    """Inflected forms of stop words mapped to stems, kept in the file."""
+
+    def __init__(self, forms: _Section, stems: _Section, table: _Table):
+        self._forms = forms
+        self._stems = stems
+        self._table = table
+
+    def __getitem__(self, form: str) -> str:
+        i: int = self._table.find(form.encode())
+        if i < 0:
+            raise KeyError(form)
+
+        return self._stems[i].decode()
+
+    def __iter__(self) -> Iterator[str]:
+        return (
+            self._forms[i].decode() for i in range(self._forms.count)
+        )
+
+    def __len__(self) -> int:
+        return self._forms.count
+
+
+class CensorIndex:
+    """Read-only view of the index file."""
+
+    def __init__(self, path: str):
+        try:
+            with open(path, 'rb') as index_file:
+                self._mmap = mmap.mmap(
+                    index_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        except (OSError, ValueError) as error:
+            raise CensorIndexError(f'Cannot map {path}: {error}')
+
+        buffer = memoryview(self._mmap)
+        try:
+            magic, version, byte_order_mark, self.digest = (
+                HEADER.unpack_from(buffer)
+            )
+            if (magic != MAGIC or version != FORMAT_VERSION
+                    or byte_order_mark != BYTE_ORDER_MARK):
+                raise CensorIndexError(f'{path} is of another format.')
+
+            phrases = _Section(buffer, HEADER.size)
+            forms = _Section(buffer, phrases.end)
+            stems = _Section(buffer, forms.end)
+            table = _Table(buffer, stems.end, forms)
+            if table.end != len(buffer) or forms.count != stems.count:
+                raise CensorIndexError(f'{path} is damaged.')
+        except (struct.error, IndexError, TypeError, ValueError) as error:
+            raise CensorIndexError(f'{path} is damaged: {error}')
+
+        # Phrases are compiled into the automaton, so they are read once.
+        self.stop_phrases: List[List[str]] = [
+            phrases[i].decode().split() for i in range(phrases.count)
+        ]
+        self.word_forms = MappedWordForms(forms, stems, table)
+
+
+def load_index(stop_words: Iterable[str],
+               path: Optional[str] = None) -> Optional[CensorIndex]:
+    """Return the index if it is built for exactly these stop words."""
+    path = path or getattr(settings, 'CENSOR_INDEX_PATH', None)
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        index = CensorIndex(path)
+    except CensorIndexError as error:
+        logger.warning('Censor index is not used: %s', error)
+        return None
+
+    if index.digest != stop_list_digest(stop_words):
+        return None
+
+    return index
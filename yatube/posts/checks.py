@@ -0,0 +1,30 @@
+"""Checks of the settings the posts app depends on."""
+from django.conf import settings
+from django.core.checks import Error, register
+
+from .feed import ENGINE_PULL, get_engine
+
+# Backends keeping the values in the memory of one process.
+PROCESS_CACHES = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register()
+def check_timeline_cache(app_configs, **kwargs):
+    """Timelines of the pull engine are updated in the shared cache."""
+    if get_engine() != ENGINE_PULL:
+        return []
+
+    if settings.CACHES['default']['BACKEND'] in PROCESS_CACHES:
+        return [
+            Error(
+                'FEED_ENGINE "pull" needs a cache shared by all processes, '
+                'otherwise other processes miss new posts.',
+                hint='Set the default cache to memcached or another '
+                     'shared backend.',
+                id='posts.E001',
+            )
+        ]
+    return []
@@ -0,0 +1,139 @@
+"""Cached numbers of posts per page scope, kept up to date by signals."""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+
+from .follows import following_ids
+from .models import ModeratedModel, Post
+
+SCOPE_ALL: str = 'all'
+SCOPE_GROUP: str = 'group'
+SCOPE_AUTHOR: str = 'author'
+# Posts of the author in any status, as the author sees them.
+SCOPE_AUTHOR_ALL: str = 'author_all'
+COUNT_KEY: str = 'posts:count:{scope}:{pk}'
+# Counts drifted by bulk changes, which send no signals, heal after it.
+COUNT_TIMEOUT: int = 60 * 10
+ESTIMATE_THRESHOLD: int = 100000
+
+Scope = Tuple[str, Optional[int]]
+
+
+def _key(scope: str, pk: Optional[int] = None) -> str:
+    return COUNT_KEY.format(scope=scope, pk=pk)
+
+
+def _queryset(scope: str, pk: Optional[int] = None):
+    if scope == SCOPE_AUTHOR_ALL:
+        return Post.objects.filter(author_id=pk)
+
+    posts = Post.objects.published()
+    if scope == SCOPE_GROUP:
+        return posts.filter(group_id=pk)
+    if scope == SCOPE_AUTHOR:
+        return posts.filter(author_id=pk)
+
+    return posts
+
+
+def _estimate() -> Optional[int]:
+    """Number of rows the planner expects in the posts table."""
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [Post._meta.db_table]
+        )
+        row = cursor.fetchone()
+
+    return int(row[0]) if row else None
+
+
+def _timeout() -> int:
+    return getattr(settings, 'POSTS_COUNT_TIMEOUT', COUNT_TIMEOUT)
+
+
+def get_post_count(scope: str, pk: Optional[int] = None) -> int:
+    """
+    Return the number of posts in the scope, counting them on a miss.
+
+    Above the threshold all published posts are not counted, the
+    estimate of the database is close enough to number the pages.
+    """
+    key: str = _key(scope, pk)
+    count: Optional[int] = cache.get(key)
+
+    if count is not None:
+        return count
+
+    if scope == SCOPE_ALL:
+        estimate: Optional[int] = _estimate()
+        threshold: int = getattr(
+            settings, 'POSTS_COUNT_ESTIMATE_THRESHOLD', ESTIMATE_THRESHOLD
+        )
+        if estimate is not None and estimate > threshold:
+            count = estimate
+    if count is None:
+        count = _queryset(scope, pk).count()
+
+    cache.set(key, count, _timeout())
+
+    return count
+
+
+def get_follow_count(user) -> int:
+    """Return the number of posts of the authors the user follows."""
+    authors: List[int] = list(following_ids(user.pk))
+    keys: Dict[str, int] = {_key(SCOPE_AUTHOR, pk): pk for pk in authors}
+    counts: Dict[str, int] = cache.get_many(keys)
+    missing: List[int] = [pk for key, pk in keys.items() if key not in counts]
+
+    if missing:
+        found: Dict[int, int] = dict(
+            Post.objects.published().filter(author_id__in=missing)
+            .values_list('author_id').annotate(count=Count('pk'))
+            .order_by()
+        )
+        computed: Dict[str, int] = {
+            _key(SCOPE_AUTHOR, pk): found.get(pk, 0) for pk in missing
+        }
+        cache.set_many(computed, _timeout())
+        counts.update(computed)
+
+    return sum(counts.values())
+
+
+def post_scopes(group_id: Optional[int], author_id: int,
+                status: str) -> List[Scope]:
+    """Scopes the post with these fields is counted in."""
+    scopes: List[Scope] = [(SCOPE_AUTHOR_ALL, author_id)]
+
+    if status == ModeratedModel.PUBLISHED:
+        scopes += [(SCOPE_ALL, None), (SCOPE_AUTHOR, author_id)]
+        if group_id is not None:
+            scopes.append((SCOPE_GROUP, group_id))
+
+    return scopes
+
+
+def _try_update(update, scope: Scope) -> None:
+    try:
+        update(_key(*scope))
+    except ValueError:
+        # Not counted yet, it is counted on the next page view.
+        pass
+
+
+def update_counts(removed: Iterable[Scope], added: Iterable[Scope]) -> None:
+    """Move the post from the removed scopes to the added ones."""
+    removed, added = set(removed), set(added)
+
+    for scope in removed - added:
+        _try_update(cache.decr, scope)
+    for scope in added - removed:
+        _try_update(cache.incr, scope)
@@ -0,0 +1,197 @@
+"""
+Follow feeds written on publish and read from one index.
+
+Published posts are copied into FeedEntry rows of every follower, so
+a feed page is a range scan over the entries of one user. Posts of
+authors with more than FANOUT_LIMIT followers are not copied on
+publish; the feed merges them with the entries when it is read.
+"""
+import heapq
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+from .counts import get_follow_count
+from .follows import count_followers, following_ids
+from .models import FeedEntry, Follow, Post
+from .timelines import Key, Timeline, key_date, post_key
+
+# Engines of the follow page, see posts.timelines for the pull one.
+ENGINE_FANOUT: str = 'fanout'
+ENGINE_PULL: str = 'pull'
+FANOUT_LIMIT: int = 1000
+BATCH_SIZE: int = 1000
+# Keys read from one source of the feed at once, a few pages.
+SCAN_SIZE: int = 100
+
+
+def get_engine() -> str:
+    """Engine building the follow page, the other one is not maintained."""
+    return getattr(settings, 'FEED_ENGINE', ENGINE_FANOUT)
+
+
+def _limit() -> int:
+    return getattr(settings, 'FEED_FANOUT_LIMIT', FANOUT_LIMIT)
+
+
+def popular_authors(author_ids: List[int]) -> List[int]:
+    """Authors whose posts are pulled by the followers, not pushed."""
+    limit: int = _limit()
+
+    return [
+        author_id
+        for author_id, followers in count_followers(author_ids).items()
+        if followers > limit
+    ]
+
+
+def _create_entries(user_ids: Iterable[int], author_id: int,
+                    posts: Iterable) -> None:
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for user_id in user_ids
+            for post_id, pub_date in posts
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out(post: Post) -> None:
+    """Add the published post to the feeds of the author's followers."""
+    if popular_authors([post.author_id]):
+        return
+
+    _create_entries(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            'user_id', flat=True
+        ).iterator(),
+        post.author_id,
+        [(post.pk, post.pub_date)],
+    )
+
+
+def withdraw(post: Post) -> None:
+    """Remove the post which is not published anymore from all feeds."""
+    FeedEntry.objects.filter(post=post).delete()
+
+
+def add_author(user_id: int, author_id: int) -> None:
+    """Fill the feed with the posts of the newly followed author."""
+    _create_entries(
+        [user_id],
+        author_id,
+        list(Post.objects.published().filter(author_id=author_id)
+             .values_list('pk', 'pub_date')),
+    )
+
+
+def remove_author(user_id: int, author_id: int) -> None:
+    """Drop the posts of the unfollowed author from the feed."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def demote_author(author_id: int) -> None:
+    """
+    Copy the posts of the author who has just stopped being popular.
+
+    Posts published while the author was popular were not copied, and
+    the feeds read them from the entries from now on.
+    """
+    if count_followers([author_id])[author_id] != _limit():
+        return
+
+    _create_entries(
+        Follow.objects.filter(author_id=author_id).values_list(
+            'user_id', flat=True
+        ).iterator(),
+        author_id,
+        list(Post.objects.published().filter(author_id=author_id)
+             .values_list('pk', 'pub_date')),
+    )
+
+
+def _scan(rows: QuerySet, pk_field: str, cursor: Optional[Key],
+          newer: bool) -> Iterator[Key]:
+    """
+    Keys of the rows past the cursor, oldest first if newer is set.
+
+    Rows are read by keyset SCAN_SIZE at a time, only as far as the
+    caller iterates.
+    """
+    lookup: str = 'gt' if newer else 'lt'
+    sign: str = '' if newer else '-'
+    rows = rows.order_by(f'{sign}pub_date', f'{sign}{pk_field}')
+
+    while True:
+        batch: QuerySet = rows
+        if cursor is not None:
+            date = key_date(cursor)
+            batch = batch.filter(
+                Q(**{f'pub_date__{lookup}': date})
+                | Q(pub_date=date, **{f'{pk_field}__{lookup}': cursor[1]})
+            )
+        keys: List[Key] = [
+            post_key(pub_date, pk)
+            for pub_date, pk in batch.values_list(
+                'pub_date', pk_field
+            )[:SCAN_SIZE]
+        ]
+        yield from keys
+        if len(keys) < SCAN_SIZE:
+            return
+        cursor = keys[-1]
+
+
+class Feed(Timeline):
+    """
+    Follow feed of the user, newest first.
+
+    Entries of the user are merged with the posts of the followed
+    popular authors, both read by keyset only as far as the page asks
+    for, so reading the feed writes nothing.
+    """
+
+    def __init__(self, user):
+        self._user = user
+        popular: List[int] = popular_authors(list(following_ids(user.pk)))
+        entries: QuerySet = FeedEntry.objects.filter(user=user)
+        if popular:
+            # Entries copied before the author became popular.
+            entries = entries.exclude(author_id__in=popular)
+
+        self._sources: List[Tuple[QuerySet, str]] = [(entries, 'post_id')]
+        self._sources += [
+            (Post.objects.published().filter(author_id=author_id), 'pk')
+            for author_id in popular
+        ]
+
+    def __len__(self) -> int:
+        return get_follow_count(self._user)
+
+    def older(self, cursor: Optional[Key] = None) -> Iterator[Key]:
+        """Keys older than the cursor, newest first."""
+        return heapq.merge(
+            *(_scan(rows, pk_field, cursor, False)
+              for rows, pk_field in self._sources),
+            reverse=True
+        )
+
+    def newer(self, cursor: Key) -> Iterator[Key]:
+        """Keys newer than the cursor, oldest first."""
+        return heapq.merge(
+            *(_scan(rows, pk_field, cursor, True)
+              for rows, pk_field in self._sources)
+        )
+
+
+def get_feed(user) -> Feed:
+    """Posts in the follow feed of the user, newest first."""
+    return Feed(user)
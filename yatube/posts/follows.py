@@ -0,0 +1,121 @@
+"""
+Follow graph kept in the cache.
+
+Authors a user follows are cached as a sorted array of ids, loaded on
+the first use and then updated by the Follow signals, so follow checks
+and feeds run no SQL in the common case. Numbers of followers are kept
+in AuthorStats and cached next to the graph.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AuthorStats, Follow
+
+FOLLOWING_KEY: str = 'follows:following:{pk}'
+FOLLOWERS_KEY: str = 'follows:followers:{pk}'
+# Processes which do not share the cache see the changes made by the
+# signals of the others after it, and so do all of them for changes
+# made by bulk queries, which send no signals.
+GRAPH_TIMEOUT: int = 5
+
+
+def _timeout() -> int:
+    return getattr(settings, 'FOLLOWS_GRAPH_TIMEOUT', GRAPH_TIMEOUT)
+
+
+def _unpack(data: bytes) -> array:
+    ids = array('q')
+    ids.frombytes(data)
+    return ids
+
+
+def following_ids(user_id: int) -> array:
+    """Sorted ids of the authors the user follows."""
+    key: str = FOLLOWING_KEY.format(pk=user_id)
+    data: Optional[bytes] = cache.get(key)
+    if data is not None:
+        return _unpack(data)
+
+    ids = array('q', sorted(
+        Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True
+        )
+    ))
+    cache.set(key, ids.tobytes(), _timeout())
+
+    return ids
+
+
+def _contains(ids: array, pk: int) -> bool:
+    i: int = bisect_left(ids, pk)
+    return i < len(ids) and ids[i] == pk
+
+
+def is_following(user_id: int, author_id: int) -> bool:
+    """Whether the user follows the author."""
+    return _contains(following_ids(user_id), author_id)
+
+
+def count_followers(author_ids: List[int]) -> Dict[int, int]:
+    """Numbers of followers of the authors, taken from their stats."""
+    keys: Dict[str, int] = {FOLLOWERS_KEY.format(pk=author_id): author_id
+                            for author_id in author_ids}
+    counts: Dict[int, int] = {
+        keys[key]: count for key, count in cache.get_many(keys).items()
+    }
+    missing: List[int] = [pk for pk in author_ids if pk not in counts]
+
+    if missing:
+        found: Dict[int, int] = dict(
+            AuthorStats.objects.filter(user_id__in=missing).values_list(
+                'user_id', 'follower_count'
+            )
+        )
+        loaded: Dict[int, int] = {pk: found.get(pk, 0) for pk in missing}
+        cache.set_many(
+            {FOLLOWERS_KEY.format(pk=pk): count
+             for pk, count in loaded.items()},
+            _timeout()
+        )
+        counts.update(loaded)
+
+    return {author_id: counts[author_id] for author_id in author_ids}
+
+
+def follower_count(author_id: int) -> int:
+    """Number of followers of the author."""
+    return count_followers([author_id])[author_id]
+
+
+def _update(user_id: int, author_id: int, delta: int) -> None:
+    # The count is read again from the stats changed by the signals.
+    cache.delete(FOLLOWERS_KEY.format(pk=author_id))
+
+    # Concurrent updates may lose one another, the timeout bounds it.
+    key: str = FOLLOWING_KEY.format(pk=user_id)
+    data: Optional[bytes] = cache.get(key)
+    if data is None:
+        return
+
+    ids: array = _unpack(data)
+    i: int = bisect_left(ids, author_id)
+    present: bool = i < len(ids) and ids[i] == author_id
+    if delta > 0 and not present:
+        ids.insert(i, author_id)
+    elif delta < 0 and present:
+        del ids[i]
+    cache.set(key, ids.tobytes(), _timeout())
+
+
+def follow_added(user_id: int, author_id: int) -> None:
+    """Add the follow to the cached graph."""
+    _update(user_id, author_id, 1)
+
+
+def follow_removed(user_id: int, author_id: int) -> None:
+    """Remove the follow from the cached graph."""
+    _update(user_id, author_id, -1)
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.censor import SIMILARITY_THRESHOLD
+from posts.censor_index import stop_list_digest, write_index
+from posts.models import CensoredWord, CensoredWordForm
+from posts.utils import CensorMatcher
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile the stop list into the index file shared by all '
+        'processes. Run it after the stop list changes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=getattr(settings, 'CENSOR_INDEX_PATH', None),
+            help='Index file, CENSOR_INDEX_PATH by default.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['path']:
+            raise CommandError('Set CENSOR_INDEX_PATH or pass --path.')
+
+        stop_words = list(CensoredWord.objects.values_list('word', flat=True))
+        word_forms = list(
+            CensoredWordForm.objects.values_list('form', 'stem')
+        )
+        matcher = CensorMatcher(stop_words, SIMILARITY_THRESHOLD)
+
+        try:
+            size: int = write_index(
+                options['path'],
+                stop_list_digest(stop_words),
+                matcher.stop_phrases,
+                word_forms,
+            )
+        except OSError as error:
+            raise CommandError(f'Cannot write {options["path"]}: {error}')
+
+        self.stdout.write(
+            f'{options["path"]}: {len(stop_words)} stop words, '
+            f'{len(word_forms)} forms, {size} bytes'
+        )
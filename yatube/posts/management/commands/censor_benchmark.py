@@ -0,0 +1,274 @@
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from faker import Faker
+
+from posts.censor import SIMILARITY_THRESHOLD, get_matcher_options
+from posts.utils import FUZZY_ENGINES, CensorMatcher, word_tokenize
+
+STOP_WORDS_SIZES: List[int] = [10, 100, 1000, 10000]
+TEXT_LENGTHS: List[int] = [100, 1000, 10000]
+TEXTS_COUNT: int = 50
+REPEAT: int = 3
+HIT_RATE: float = 0.1
+TOLERANCE: float = 0.2
+SEED: int = 0
+LETTERS: str = 'абвгдежзийклмнопрстуфхцчшщыьэюя'
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of the values."""
+    ordered: List[float] = sorted(values)
+    rank: int = max(round(len(ordered) * percent / 100) - 1, 0)
+
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def make_stop_words(fake: Faker, size: int) -> List[str]:
+    """Dictionary words first, then made up ones to reach the size."""
+    words: List[str] = list(dict.fromkeys(
+        fake.words(min(size, 400), unique=True)
+    ))
+
+    while len(words) < size:
+        words.append(fake.lexify(
+            '?' * fake.random_int(4, 10), letters=LETTERS
+        ))
+
+    return list(dict.fromkeys(words))[:size]
+
+
+def make_texts(fake: Faker, length: int, count: int,
+               stop_words: List[str], hit_rate: float) -> List[str]:
+    """Texts of about the length, some of them with a stop word inside."""
+    texts: List[str] = []
+
+    for _ in range(count):
+        words: List[str] = fake.text(max(length, 5)).split()
+        if fake.random.random() < hit_rate:
+            words.insert(
+                fake.random.randrange(len(words) + 1),
+                fake.random.choice(stop_words),
+            )
+        texts.append(' '.join(words))
+
+    return texts
+
+
+def run_case(stop_words: List[str], texts: List[str], repeat: int,
+             options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Measure the work bad_language_validation does for every text.
+
+    Building the matcher is measured once, since the forms reuse it,
+    then every text is validated repeat times by the built matcher.
+    """
+    start: float = time.perf_counter()
+    matcher = CensorMatcher(stop_words, SIMILARITY_THRESHOLD, **options)
+    build_ms: float = (time.perf_counter() - start) * 1000
+
+    # Warm the normal form cache, as a running server has it warm.
+    for text in texts:
+        matcher.validate(text)
+
+    latencies: List[float] = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            matcher.validate(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Memory is traced in a separate pass, tracing slows every call down.
+    tracemalloc.start()
+    try:
+        matcher = CensorMatcher(stop_words, SIMILARITY_THRESHOLD, **options)
+        for text in texts:
+            matcher.validate(text)
+        peak_memory: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    tokens: int = sum(len(word_tokenize(text)) for text in texts) * repeat
+
+    return {
+        'stop_words': len(stop_words),
+        'text_length': sum(map(len, texts)) // len(texts),
+        'texts': len(texts),
+        'tokens': tokens,
+        'build_ms': build_ms,
+        'tokens_per_second': tokens / (sum(latencies) / 1000),
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies),
+        },
+        'peak_memory_kb': peak_memory / 1024,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """Describe the cases that got slower or bigger than in the baseline."""
+    regressions: List[str] = []
+
+    for name, case in results['cases'].items():
+        base: Optional[Dict[str, Any]] = baseline['cases'].get(name)
+        if base is None:
+            continue
+
+        checks = (
+            ('tokens/s', base['tokens_per_second'] * (1 - tolerance),
+             case['tokens_per_second'], True),
+            ('p95 ms', base['latency_ms']['p95'] * (1 + tolerance),
+             case['latency_ms']['p95'], False),
+            ('peak KiB', base['peak_memory_kb'] * (1 + tolerance),
+             case['peak_memory_kb'], False),
+        )
+        for metric, limit, value, higher_is_better in checks:
+            if value < limit if higher_is_better else value > limit:
+                regressions.append(
+                    f'{name}: {metric} {value:.1f}, limit {limit:.1f}'
+                )
+
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the censor on synthetic Russian texts and compare '
+        'the results against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stop-words',
+            type=int,
+            nargs='+',
+            default=STOP_WORDS_SIZES,
+            help='Sizes of the stop lists to check.',
+        )
+        parser.add_argument(
+            '--lengths',
+            type=int,
+            nargs='+',
+            default=TEXT_LENGTHS,
+            help='Lengths of the texts in characters.',
+        )
+        parser.add_argument(
+            '--texts',
+            type=int,
+            default=TEXTS_COUNT,
+            help='Number of texts of every length.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=REPEAT,
+            help='Number of times every text is checked.',
+        )
+        parser.add_argument(
+            '--hit-rate',
+            type=float,
+            default=HIT_RATE,
+            help='Share of the texts containing a stop word.',
+        )
+        parser.add_argument(
+            '--fuzzy-engine',
+            choices=FUZZY_ENGINES,
+            help='Fuzzy engine to use instead of the configured one.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=SEED,
+            help='Seed of the generated texts and stop lists.',
+        )
+        parser.add_argument(
+            '--output',
+            help='JSON file to write the results to.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON file with earlier results to compare against.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=TOLERANCE,
+            help='Allowed share of slowdown or memory growth.',
+        )
+
+    def handle(self, *args, **options):
+        baseline: Optional[Dict[str, Any]] = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as error:
+                raise CommandError(
+                    f'Cannot read baseline {options["baseline"]}: {error}'
+                )
+
+        matcher_options: Dict[str, Any] = get_matcher_options()
+        if options['fuzzy_engine']:
+            matcher_options['fuzzy_engine'] = options['fuzzy_engine']
+
+        results: Dict[str, Any] = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'seed': options['seed'],
+            'options': matcher_options,
+            'cases': {},
+        }
+
+        for size in options['stop_words']:
+            for length in options['lengths']:
+                # Every case gets the same data whatever cases run before.
+                fake = Faker('ru_RU')
+                fake.seed_instance(f'{options["seed"]}-{size}-{length}')
+                stop_words = make_stop_words(fake, size)
+                texts = make_texts(fake, length, options['texts'],
+                                   stop_words, options['hit_rate'])
+
+                case = run_case(stop_words, texts, options['repeat'],
+                                matcher_options)
+                name: str = f'stop_words={size} length={length}'
+                results['cases'][name] = case
+                self._print_case(name, case, baseline)
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError(
+                    'Regressions found:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write('No regressions found.')
+
+    def _print_case(self, name, case, baseline):
+        line: str = (
+            f'{name:<30}{case["tokens_per_second"]:>12.0f} tokens/s'
+            f'{case["latency_ms"]["p50"]:>9.2f} p50 ms'
+            f'{case["latency_ms"]["p95"]:>9.2f} p95 ms'
+            f'{case["peak_memory_kb"]:>10.0f} KiB'
+            f'{case["build_ms"]:>10.1f} build ms'
+        )
+
+        base = baseline and baseline['cases'].get(name)
+        if base:
+            change: float = (
+                case['tokens_per_second'] / base['tokens_per_second'] - 1
+            )
+            line += f'{change:>+8.1%}'
+
+        self.stdout.write(line)
@@ -0,0 +1,147 @@
+import json
+import os
+from typing import Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.censor import WARM_UP_TEXT, get_matcher, warm_up
+
+WORKERS: int = 4
+SMAPS_PATH: str = '/proc/self/smaps_rollup'
+FIELDS: Dict[str, List[str]] = {
+    'rss': ['Rss'],
+    'pss': ['Pss'],
+    'shared': ['Shared_Clean', 'Shared_Dirty'],
+    'private': ['Private_Clean', 'Private_Dirty'],
+}
+
+
+def read_memory() -> Dict[str, int]:
+    """Memory of this process in KiB as the kernel accounts it."""
+    values: Dict[str, int] = {}
+
+    with open(SMAPS_PATH) as smaps:
+        for line in smaps:
+            name, _, value = line.partition(':')
+            if value.strip().endswith('kB'):
+                values[name] = int(value.split()[0])
+
+    return {
+        field: sum(values.get(name, 0) for name in names)
+        for field, names in FIELDS.items()
+    }
+
+
+def _serve(preloaded: bool) -> Dict[str, int]:
+    """Check a text in the worker as it does on the first request."""
+    if not preloaded:
+        warm_up()
+    get_matcher().find_bad_spans(WARM_UP_TEXT)
+
+    return read_memory()
+
+
+class Command(BaseCommand):
+    help = (
+        'Fork workers with and without the censor warmed up and print '
+        'their memory, showing what the workers share.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=WORKERS,
+            help='Number of workers to fork.',
+        )
+        parser.add_argument(
+            '--no-preload',
+            action='store_true',
+            help='Warm the censor up in every worker after the fork.',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON.',
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(os, 'fork') or not os.path.exists(SMAPS_PATH):
+            raise CommandError('The report needs fork and Linux /proc.')
+
+        preloaded: bool = not options['no_preload']
+        report = {
+            'preloaded': preloaded,
+            'master_before': read_memory(),
+        }
+        if preloaded:
+            warm_up()
+        report['master_after'] = read_memory()
+
+        # Every worker opens its own connection, as the server ones do.
+        connections.close_all()
+        report['workers'] = [
+            self._fork(preloaded) for _ in range(max(options['workers'], 1))
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self._print_table(report)
+
+    def _fork(self, preloaded: bool) -> Dict[str, int]:
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(read_end)
+            code: int = 0
+            try:
+                with os.fdopen(write_end, 'w') as pipe:
+                    json.dump(_serve(preloaded), pipe)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+
+        os.close(write_end)
+        with os.fdopen(read_end) as pipe:
+            data: str = pipe.read()
+        _, status = os.waitpid(pid, 0)
+
+        if status or not data:
+            raise CommandError(f'Worker {pid} failed.')
+
+        return json.loads(data)
+
+    def _print_table(self, report):
+        self.stdout.write(
+            'Preloaded before fork' if report['preloaded']
+            else 'Loaded in every worker'
+        )
+        self.stdout.write(
+            f'{"process":<16}' + ''.join(
+                f'{field + " KiB":>14}' for field in FIELDS
+            )
+        )
+
+        rows = [
+            ('master before', report['master_before']),
+            ('master after', report['master_after']),
+        ] + [
+            (f'worker {number}', memory)
+            for number, memory in enumerate(report['workers'], 1)
+        ]
+        for name, memory in rows:
+            self.stdout.write(
+                f'{name:<16}' + ''.join(
+                    f'{memory[field]:>14}' for field in FIELDS
+                )
+            )
+
+        self.stdout.write(
+            'Workers private total: '
+            f'{sum(memory["private"] for memory in report["workers"])} KiB'
+        )
@@ -0,0 +1,92 @@
+import heapq
+import json
+from itertools import chain
+from typing import List, Tuple
+
+from django.core.management.base import BaseCommand
+
+from posts.censor import get_matcher, timed_find_bad_spans
+from posts.models import Comment, Post
+from posts.stats import stats
+
+SAMPLE_SIZE: int = 1000
+TOP_SIZE: int = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Check the latest posts and comments and print per-stage '
+        'timings of the censor with the slowest texts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=SAMPLE_SIZE,
+            help='Number of the latest posts and of comments to check.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=TOP_SIZE,
+            help='Number of the slowest texts to list.',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the histograms as JSON.',
+        )
+
+    def handle(self, *args, **options):
+        matcher = get_matcher()
+        stats.reset()
+        slowest: List[Tuple[float, str, int, int]] = []
+        rows = chain(
+            (('post', pk, text) for pk, text in Post.objects.order_by(
+                '-pk').values_list('pk', 'text')[:options['sample']]),
+            (('comment', pk, text) for pk, text in Comment.objects.order_by(
+                '-pk').values_list('pk', 'text')[:options['sample']]),
+        )
+
+        for kind, pk, text in rows:
+            _, timings = timed_find_bad_spans(matcher, text)
+            item = (timings.stages['total'] * 1000, kind, pk, len(text))
+            if len(slowest) < options['top']:
+                heapq.heappush(slowest, item)
+            else:
+                heapq.heappushpop(slowest, item)
+
+        snapshot = stats.snapshot()
+        snapshot['slowest'] = [
+            {'kind': kind, 'id': pk, 'length': length, 'ms': milliseconds}
+            for milliseconds, kind, pk, length in sorted(slowest, reverse=True)
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps(snapshot, indent=2))
+            return
+
+        self._print_table(snapshot)
+
+    def _print_table(self, snapshot):
+        self.stdout.write(f'Stop words: {snapshot["stop_words"]}')
+        self.stdout.write(
+            f'{"stage":<12}{"count":>8}{"mean":>10}{"p50":>10}'
+            f'{"p95":>10}{"p99":>10}{"max":>10}'
+        )
+        histograms = dict(snapshot['stages_ms'], tokens=snapshot['tokens'])
+        for name, histogram in histograms.items():
+            self.stdout.write(
+                f'{name:<12}{histogram["count"]:>8}'
+                f'{histogram["mean"]:>10.2f}{histogram["p50"]:>10.2f}'
+                f'{histogram["p95"]:>10.2f}{histogram["p99"]:>10.2f}'
+                f'{histogram["max"]:>10.2f}'
+            )
+
+        self.stdout.write('Slowest texts:')
+        for item in snapshot['slowest']:
+            self.stdout.write(
+                f'{item["kind"]} {item["id"]}: {item["ms"]:.1f} ms, '
+                f'{item["length"]} characters'
+            )
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.moderation import BATCH_SIZE, process_tasks
+
+
+class Command(BaseCommand):
+    help = 'Publish or reject posts and comments waiting for moderation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of texts taken from the queue at once.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit as soon as the queue is empty.',
+        )
+
+    def handle(self, *args, **options):
+        processed: int = 0
+
+        while True:
+            taken: int = process_tasks(options['batch_size'])
+            processed += taken
+
+            if taken:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(f'Moderated: {processed}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.feed import add_author
+from posts.models import FeedEntry, Follow
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the follow feeds of all users again. Run it after '
+        'FEED_ENGINE is switched back to "fanout".'
+    )
+
+    def handle(self, *args, **options):
+        follows = Follow.objects.order_by('pk').values_list(
+            'user_id', 'author_id'
+        )
+
+        with transaction.atomic():
+            FeedEntry.objects.all().delete()
+            for user_id, author_id in follows.iterator():
+                add_author(user_id, author_id)
+
+        self.stdout.write(
+            f'Feeds of {follows.count()} follows, '
+            f'{FeedEntry.objects.count()} entries'
+        )
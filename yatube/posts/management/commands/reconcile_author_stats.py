@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts.author_stats import BATCH_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount posts and follows of all authors and repair the stored '
+        'stats that drifted, for example after bulk queries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of authors recounted and updated at once.',
+        )
+
+    def handle(self, *args, **options):
+        repaired: int = 0
+
+        for batch, count in enumerate(
+            reconcile(max(options['batch_size'], 1)), 1
+        ):
+            repaired += count
+            self.stdout.write(f'batch {batch}: repaired {count}')
+
+        self.stdout.write(f'Repaired stats of {repaired} authors')
@@ -0,0 +1,190 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.censor import (SIMILARITY_THRESHOLD, get_matcher_options,
+                          get_version)
+from posts.models import (CensoredWord, CensoredWordForm, Comment,
+                          ModeratedModel, Post)
+from posts.utils import CensorMatcher, mask_spans
+
+CHUNK_SIZE: int = 2000
+VERSION: str = 'version'
+MODELS = {
+    'posts': Post,
+    'comments': Comment,
+}
+
+_matcher: Optional[CensorMatcher] = None
+
+
+def _init_worker(stop_words: List[str], word_forms: List[Tuple[str, str]],
+                 options: Dict[str, Any]) -> None:
+    global _matcher
+
+    _matcher = CensorMatcher(
+        stop_words, SIMILARITY_THRESHOLD, word_forms=word_forms, **options
+    )
+
+
+def _find_bad_spans_many(texts: List[str]) -> List[List[Tuple[int, int]]]:
+    return _matcher.find_bad_spans_many(texts)
+
+
+class Command(BaseCommand):
+    help = 'Check existing posts and comments against the current stop list.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            choices=MODELS,
+            action='append',
+            help='Model to check, posts and comments by default.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Number of rows read, checked and updated at once.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of processes checking texts.',
+        )
+        parser.add_argument(
+            '--mask',
+            action='store_true',
+            help='Replace bad words with asterisks instead of rejecting.',
+        )
+        parser.add_argument(
+            '--after-id',
+            type=int,
+            help='Start after this id instead of the checkpoint.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help=(
+                'JSON file keeping the last checked id of every model. '
+                'It is started over when the stop list changes.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        checkpoint: Dict[str, Any] = self._load_checkpoint(
+            options['checkpoint']
+        )
+        initargs = (
+            list(CensoredWord.objects.values_list('word', flat=True)),
+            list(CensoredWordForm.objects.values_list('form', 'stem')),
+            get_matcher_options(),
+        )
+        _init_worker(*initargs)
+
+        with ProcessPoolExecutor(
+            max_workers=max(options['workers'], 1),
+            initializer=_init_worker,
+            initargs=initargs,
+        ) as executor:
+            for name in options['model'] or MODELS:
+                after_id: int = options['after_id']
+                if after_id is None:
+                    after_id = checkpoint.get(name, 0)
+                self._rescan(name, after_id, executor, checkpoint, options)
+
+    def _rescan(self, name, after_id, executor, checkpoint, options):
+        model = MODELS[name]
+        rows = model.objects.filter(pk__gt=after_id).order_by('pk')
+        chunk: List[Tuple[int, str]] = []
+        flagged: int = 0
+
+        for row in rows.values_list('pk', 'text').iterator(
+            chunk_size=options['chunk_size']
+        ):
+            chunk.append(row)
+            if len(chunk) == options['chunk_size']:
+                flagged += self._process_chunk(model, chunk, executor,
+                                               options)
+                self._save_checkpoint(name, chunk[-1][0], checkpoint,
+                                      options['checkpoint'])
+                chunk = []
+
+        if chunk:
+            flagged += self._process_chunk(model, chunk, executor, options)
+            self._save_checkpoint(name, chunk[-1][0], checkpoint,
+                                  options['checkpoint'])
+
+        self.stdout.write(f'{name}: flagged {flagged}')
+
+    def _process_chunk(self, model, chunk, executor, options) -> int:
+        texts: List[str] = [text for _, text in chunk]
+        # Every worker checks a few batches of texts at once.
+        step: int = max(len(texts) // (max(options['workers'], 1) * 4), 1)
+        batches = [
+            texts[start:start + step]
+            for start in range(0, len(texts), step)
+        ]
+
+        if options['workers'] > 1:
+            found = executor.map(_find_bad_spans_many, batches)
+        else:
+            found = map(_find_bad_spans_many, batches)
+
+        results = (spans for batch in found for spans in batch)
+
+        flagged = {
+            pk: (text, spans)
+            for (pk, text), spans in zip(chunk, results) if spans
+        }
+        changed: int = 0
+
+        # Rows are saved one by one, so the signals keep the cached
+        # counts, feeds and timelines in step. Few rows are flagged.
+        with transaction.atomic():
+            rows = model.objects.select_for_update().in_bulk(list(flagged))
+            for obj in rows.values():
+                text, spans = flagged[obj.pk]
+                if obj.text != text:
+                    # Edited after the scan, the spans do not fit the new
+                    # text, which was checked when it was saved.
+                    continue
+                if options['mask']:
+                    obj.text = mask_spans(obj.text, spans)
+                    obj.save(update_fields=['text'])
+                else:
+                    obj.status = ModeratedModel.REJECTED
+                    obj.save(update_fields=['status'])
+                changed += 1
+
+        return changed
+
+    def _load_checkpoint(self, path: Optional[str]) -> Dict[str, Any]:
+        version: str = get_version()
+        if not path or not os.path.exists(path):
+            return {VERSION: version}
+
+        try:
+            with open(path) as checkpoint_file:
+                checkpoint: Dict[str, Any] = json.load(checkpoint_file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Cannot read checkpoint {path}: {error}')
+
+        # Rows checked against another stop list are checked again.
+        if checkpoint.get(VERSION) != version:
+            self.stdout.write('Stop list has changed, starting over')
+            return {VERSION: version}
+
+        return checkpoint
+
+    def _save_checkpoint(self, name, last_id, checkpoint, path) -> None:
+        checkpoint[name] = last_id
+        self.stdout.write(f'{name}: checked up to id {last_id}')
+
+        if path:
+            with open(path, 'w') as checkpoint_file:
+                json.dump(checkpoint, checkpoint_file)
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:02
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Frozen copies of posts.utils as of this migration, so later changes of
+# the tokenizer or the normalization do not change what it produces.
+TOKEN_RE = re.compile(r"\w+(?:[-'’]\w+)*|[^\w\s]")
+
+
+def inflect_word(morph, stemmer, word):
+    parse = morph.parse(word.lower())[0]
+    stem = stemmer.stem(parse.normal_form)
+    forms = dict.fromkeys(form.word for form in parse.lexeme)
+    forms.update(dict.fromkeys(form.replace('ё', 'е') for form in forms))
+
+    return [(form, stem) for form in forms]
+
+
+def expand_censored_words(apps, schema_editor):
+    CensoredWord = apps.get_model('posts', 'CensoredWord')
+    CensoredWordForm = apps.get_model('posts', 'CensoredWordForm')
+
+    words = [
+        censored_word for censored_word in CensoredWord.objects.all()
+        if len(TOKEN_RE.findall(censored_word.word)) == 1
+    ]
+    if not words:
+        return
+
+    import pymorphy2
+    from nltk.stem.snowball import SnowballStemmer
+    morph = pymorphy2.MorphAnalyzer()
+    stemmer = SnowballStemmer('russian')
+
+    CensoredWordForm.objects.bulk_create(
+        CensoredWordForm(word=censored_word, form=form, stem=stem)
+        for censored_word in words
+        for form, stem in inflect_word(morph, stemmer, censored_word.word)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_auto_20230327_1410'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CensoredWordForm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('form', models.CharField(max_length=100, verbose_name='Словоформа')),
+                ('stem', models.CharField(max_length=100, verbose_name='Основа')),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forms', to='posts.CensoredWord', verbose_name='Запретное слово')),
+            ],
+            options={
+                'verbose_name': 'Словоформа',
+                'verbose_name_plural': 'Словоформы',
+            },
+        ),
+        migrations.RunPython(
+            expand_censored_words,
+            migrations.RunPython.noop,
+        ),
+    ]
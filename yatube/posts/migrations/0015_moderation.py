@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_censoredwordform'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='status',
+            field=models.CharField(choices=[('published', 'Опубликовано'), ('pending', 'На модерации'), ('rejected', 'Отклонено')], default='published', max_length=10, verbose_name='Статус'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='status',
+            field=models.CharField(choices=[('published', 'Опубликовано'), ('pending', 'На модерации'), ('rejected', 'Отклонено')], default='published', max_length=10, verbose_name='Статус'),
+        ),
+        migrations.CreateModel(
+            name='ModerationTask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата постановки в очередь')),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='moderation_tasks', to='posts.Comment', verbose_name='Комментарий')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='moderation_tasks', to='posts.Post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'Задача модерации',
+                'verbose_name_plural': 'Задачи модерации',
+                'ordering': ('pk',),
+            },
+        ),
+    ]
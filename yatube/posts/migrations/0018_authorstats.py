@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+
+    def counts(model, field):
+        return dict(
+            model.objects.values_list(field).annotate(
+                count=models.Count('pk')
+            ).order_by()
+        )
+
+    post_counts = counts(Post, 'author_id')
+    follower_counts = counts(Follow, 'author_id')
+    following_counts = counts(Follow, 'user_id')
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(
+                user_id=pk,
+                post_count=post_counts.get(pk, 0),
+                follower_count=follower_counts.get(pk, 0),
+                following_count=following_counts.get(pk, 0),
+            )
+            for pk in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0017_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('follower_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
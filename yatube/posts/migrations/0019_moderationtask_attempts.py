@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationtask',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Неудачных попыток'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_moderationtask_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationtask',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу'),
+        ),
+    ]
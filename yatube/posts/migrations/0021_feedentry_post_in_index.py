@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_moderationtask_claimed_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='feedentry',
+            name='feed_user_pub_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', 'pub_date', 'post'], name='feed_user_pub_date_idx'),
+        ),
+    ]
@@ -25,7 +25,42 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class ModeratedQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(status=ModeratedModel.PUBLISHED)
+
+
+class ModeratedModel(models.Model):
+    """
+    Text which can wait for the moderation before it is shown.
+    """
+    PUBLISHED: str = 'published'
+    PENDING: str = 'pending'
+    REJECTED: str = 'rejected'
+    STATUS_CHOICES = (
+        (PUBLISHED, 'Опубликовано'),
+        (PENDING, 'На модерации'),
+        (REJECTED, 'Отклонено'),
+    )
+
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PUBLISHED,
+    )
+
+    objects = ModeratedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    @property
+    def is_published(self) -> bool:
+        return self.status == self.PUBLISHED
+
+
+class Post(ModeratedModel):
     """
     Post model is responsible for the post.
     """
@@ -65,6 +100,18 @@ class Post(models.Model):
         ordering = (PUB_DATE_DESC,)
         verbose_name = 'Публикация'
         verbose_name_plural = 'Публикации'
+        # Every list of posts is read newest first, whole or by one key.
+        indexes = [
+            models.Index(
+                fields=['status', 'pub_date'], name='post_status_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', 'pub_date'], name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date'], name='post_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:POST_TEXT_LIMIT]
@@ -84,7 +131,28 @@ class CensoredWord(models.Model):
         return self.word
 
 
-class Comment(models.Model):
+class CensoredWordForm(models.Model):
+    """
+    Inflected form of the prohibited word.
+    """
+    word = models.ForeignKey(
+        CensoredWord,
+        on_delete=models.CASCADE,
+        related_name='forms',
+        verbose_name='Запретное слово'
+    )
+    form = models.CharField('Словоформа', max_length=100)
+    stem = models.CharField('Основа', max_length=100)
+
+    class Meta:
+        verbose_name = 'Словоформа'
+        verbose_name_plural = 'Словоформы'
+
+    def __str__(self):
+        return self.form
+
+
+class Comment(ModeratedModel):
     """Comment model."""
     post = models.ForeignKey(
         Post,
@@ -108,6 +176,11 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии',
         ordering = (COMM_DATE_DESC,)
+        indexes = [
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:POST_TEXT_LIMIT]
@@ -147,3 +220,120 @@ class Follow(models.Model):
 
         if self.user == self.author:
             raise ValidationError('Нельзя подписаться на самого себя')
+
+
+class FeedEntry(models.Model):
+    """Published post in the follow feed of the user."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        db_index=False,
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Публикация',
+    )
+    # Copies of the post fields, so the feed is read from one index.
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name='Автор',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = (PUB_DATE_DESC,)
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            UniqueConstraint(
+                name='unique_feed_entry',
+                fields=['user', 'post'],
+            )
+        ]
+        indexes = [
+            # Post ids break ties of the dates, as in the merged feed.
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='feed_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'author', 'pub_date'],
+                name='feed_user_author_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} <- {self.post}'
+
+
+class AuthorStats(models.Model):
+    """Numbers shown on the author's pages, kept up to date by signals."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    post_count = models.PositiveIntegerField('Постов', default=0)
+    follower_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class ModerationTask(models.Model):
+    """Post or comment waiting for the background moderation."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='moderation_tasks',
+        verbose_name='Публикация',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='moderation_tasks',
+        verbose_name='Комментарий',
+    )
+    created = models.DateTimeField(
+        'Дата постановки в очередь',
+        auto_now_add=True,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Неудачных попыток',
+        default=0,
+    )
+    claimed_at = models.DateTimeField(
+        'Взята в работу',
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = 'Задача модерации'
+        verbose_name_plural = 'Задачи модерации'
+        ordering = ('pk',)
+
+    def __str__(self):
+        return f'{self.post or self.comment}'
+
+    @property
+    def target(self) -> ModeratedModel:
+        return self.post or self.comment
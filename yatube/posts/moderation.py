@@ -0,0 +1,113 @@
+"""Deferred moderation of posts and comments."""
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .censor import find_bad_spans
+from .models import Comment, ModeratedModel, ModerationTask, Post
+
+BATCH_SIZE: int = 100
+MAX_ATTEMPTS: int = 3
+# Seconds after which a task claimed by a dead worker is taken again.
+LEASE_TIMEOUT: int = 60 * 5
+
+logger = logging.getLogger('posts.moderation')
+
+
+def is_deferred() -> bool:
+    """Check if texts are censored by the worker instead of the form."""
+    return getattr(settings, 'CENSOR_DEFERRED', False)
+
+
+def save_for_moderation(obj: ModeratedModel) -> None:
+    """Save post or comment, hiding it till the worker checks it."""
+    if not is_deferred():
+        obj.save()
+        return
+
+    with transaction.atomic():
+        obj.status = ModeratedModel.PENDING
+        obj.save()
+        ModerationTask.objects.create(
+            post=obj if isinstance(obj, Post) else None,
+            comment=obj if isinstance(obj, Comment) else None,
+        )
+
+
+def moderate(obj: ModeratedModel) -> bool:
+    """Publish the text if it is clean, otherwise reject it."""
+    is_clean: bool = not find_bad_spans(obj.text)
+    obj.status = (
+        ModeratedModel.PUBLISHED if is_clean else ModeratedModel.REJECTED
+    )
+    obj.save(update_fields=['status'])
+
+    return is_clean
+
+
+def _max_attempts() -> int:
+    return getattr(settings, 'MODERATION_MAX_ATTEMPTS', MAX_ATTEMPTS)
+
+
+def _queued_tasks(now: datetime) -> QuerySet:
+    """Tasks nobody works on: new, failed or with an expired lease."""
+    expired: datetime = now - timedelta(
+        seconds=getattr(settings, 'MODERATION_LEASE_TIMEOUT', LEASE_TIMEOUT)
+    )
+    tasks = ModerationTask.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired),
+        attempts__lt=_max_attempts(),
+    ).prefetch_related('post', 'comment')
+    if connection.features.has_select_for_update_skip_locked:
+        # Several workers take different tasks instead of waiting.
+        tasks = tasks.select_for_update(skip_locked=True)
+    return tasks
+
+
+def _claim_tasks(batch_size: int) -> List[ModerationTask]:
+    """Lease queued tasks in one short transaction."""
+    now: datetime = timezone.now()
+    with transaction.atomic():
+        # Workers which read the same tasks race to lease them, only the
+        # one which changed the lease moderates the task. A task stays
+        # in the queue till it is moderated, so the lease of a worker
+        # which died runs out and the task is taken again.
+        return [
+            task for task in _queued_tasks(now)[:batch_size]
+            if ModerationTask.objects.filter(
+                pk=task.pk, claimed_at=task.claimed_at
+            ).update(claimed_at=now)
+        ]
+
+
+def process_tasks(batch_size: int = BATCH_SIZE) -> int:
+    """Moderate a batch of queued texts, return how many were taken."""
+    tasks: List[ModerationTask] = _claim_tasks(batch_size)
+
+    for task in tasks:
+        try:
+            with transaction.atomic():
+                moderate(task.target)
+                task.delete()
+        except Exception:
+            attempts: int = task.attempts + 1
+            ModerationTask.objects.filter(pk=task.pk).update(
+                attempts=attempts, claimed_at=None
+            )
+            if attempts < _max_attempts():
+                logger.exception('Moderation of %s failed, queued again.',
+                                 task)
+            else:
+                # The task is kept and shown in the admin, which can
+                # queue it again.
+                logger.exception(
+                    'Moderation of %s failed %s times, %s stays pending.',
+                    task, attempts, task.target
+                )
+
+    return len(tasks)
@@ -0,0 +1,179 @@
+"""Pagination without COUNT and OFFSET on every page."""
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+AFTER: str = 'after'
+BEFORE: str = 'before'
+# Ids out of the signed 64-bit range overflow the database integers.
+MAX_PK: int = 2 ** 63 - 1
+
+
+def encode_cursor(obj: Any, field: str = 'pub_date') -> str:
+    """Opaque token pointing at the object."""
+    value: datetime = getattr(obj, field)
+
+    return urlsafe_base64_encode(f'{value.isoformat()} {obj.pk}'.encode())
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Date and id of the token, None if it is missing or broken."""
+    if not token:
+        return None
+
+    try:
+        value, pk = urlsafe_base64_decode(token).decode().split(' ')
+        date: Optional[datetime] = parse_datetime(value)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+
+    if date is None or timezone.is_naive(date):
+        return None
+    if not -MAX_PK - 1 <= pk <= MAX_PK:
+        return None
+
+    try:
+        # Dates next to the ends of the calendar have no UTC value.
+        date = date.astimezone(timezone.utc)
+    except OverflowError:
+        return None
+
+    return date, pk
+
+
+class CursorPage(Sequence):
+    """
+    Page of newest first objects next to a cursor.
+
+    Mirrors the navigation part of Django Page, so the same templates
+    render it, but has cursors instead of page numbers.
+    """
+
+    is_cursor: bool = True
+    number = None
+
+    def __init__(self, object_list: List[Any], cursor: str, direction: str,
+                 has_previous: bool, has_next: bool, field: str):
+        self.object_list = object_list
+        self.cursor = cursor
+        # AFTER or BEFORE, pages on the two sides of a cursor differ.
+        self.direction = direction
+        self._has_previous = has_previous
+        self._has_next = has_next
+        self.previous_cursor: Optional[str] = (
+            encode_cursor(object_list[0], field)
+            if has_previous and object_list else None
+        )
+        self.next_cursor: Optional[str] = (
+            encode_cursor(object_list[-1], field)
+            if has_next and object_list else None
+        )
+
+    def __repr__(self):
+        return f'<Cursor page {self.cursor!r}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_previous or self._has_next
+
+
+class CursorPaginator:
+    """
+    Split newest first objects into pages by the last seen object.
+
+    One query fetches a row more than the page holds to tell if there is
+    a next page, so neither COUNT nor OFFSET is ever run and the pages
+    do not shift when new objects arrive.
+    """
+
+    def __init__(self, object_list: QuerySet, per_page: int,
+                 field: str = 'pub_date'):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.field = field
+
+    def _older(self, cursor: Tuple[datetime, int]) -> Q:
+        value, pk = cursor
+        return (Q(**{f'{self.field}__lt': value})
+                | Q(**{self.field: value, 'pk__lt': pk}))
+
+    def _newer(self, cursor: Tuple[datetime, int]) -> Q:
+        value, pk = cursor
+        return (Q(**{f'{self.field}__gt': value})
+                | Q(**{self.field: value, 'pk__gt': pk}))
+
+    def get_page(self, after: Optional[str] = None,
+                 before: Optional[str] = None) -> CursorPage:
+        """
+        Return the page older than after or newer than before.
+
+        A missing or broken cursor gives the first page, like
+        Paginator.get_page() does for a wrong number, and so does
+        a page newer than before reaching the newest objects.
+        """
+        newest_first = self.object_list.order_by(f'-{self.field}', '-pk')
+        after_cursor = decode_cursor(after)
+        before_cursor = decode_cursor(before)
+
+        if before_cursor is not None:
+            rows: List[Any] = list(
+                self.object_list.filter(self._newer(before_cursor))
+                .order_by(self.field, 'pk')[:self.per_page + 1]
+            )
+            if len(rows) > self.per_page:
+                rows = rows[:self.per_page][::-1]
+                has_next: bool = newest_first.filter(
+                    self._older((getattr(rows[-1], self.field), rows[-1].pk))
+                ).exists()
+                return CursorPage(
+                    rows, before, BEFORE, True, has_next, self.field
+                )
+            after_cursor = None
+
+        elif after_cursor is not None:
+            newest_first = newest_first.filter(self._older(after_cursor))
+
+        rows = list(newest_first[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        has_previous = after_cursor is not None and bool(rows) and (
+            self.object_list.filter(
+                self._newer((getattr(rows[0], self.field), rows[0].pk))
+            ).exists()
+        )
+
+        return CursorPage(
+            rows, after if after_cursor else '', AFTER, has_previous,
+            has_next, self.field
+        )
+
+
+class CountedPaginator(Paginator):
+    """Paginator taking the number of objects from a count provider."""
+
+    def __init__(self, object_list, per_page, count_provider, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count_provider = count_provider
+
+    @cached_property
+    def count(self) -> int:
+        return self._count_provider()
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .author_stats import (FOLLOWER_COUNT, FOLLOWING_COUNT, POST_COUNT,
+                           change_stats)
+from .censor import invalidate_matcher, store_word_forms
+from .counts import post_scopes, update_counts
+from .feed import (ENGINE_FANOUT, ENGINE_PULL, add_author, demote_author,
+                   fan_out, get_engine, remove_author, withdraw)
+from .follows import follow_added, follow_removed
+from .models import (AuthorStats, CensoredWord, Follow, ModeratedModel,
+                     Post, User)
+from .timelines import post_key, update_timeline
+
+
+@receiver(post_save, sender=CensoredWord)
+def censored_word_saved(instance, raw=False, **kwargs):
+    """Expand the saved censored word into its inflected forms."""
+    if not raw:
+        store_word_forms(instance)
+    censored_word_changed()
+
+
+@receiver(post_delete, sender=CensoredWord)
+def censored_word_changed(**kwargs):
+    """Rebuild the censor matcher once the stop list is changed."""
+    invalidate_matcher()
+    # A matcher built by a concurrent request before the commit is stale.
+    transaction.on_commit(invalidate_matcher)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(instance, **kwargs):
+    """Remember the group, author and status the post had before."""
+    instance._saved_state = None
+    if instance.pk is not None:
+        instance._saved_state = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', 'author_id', 'status').first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(instance, **kwargs):
+    """Move the post between the counts, the stats and the feeds."""
+    saved_state = getattr(instance, '_saved_state', None)
+    update_counts(
+        post_scopes(*saved_state) if saved_state else [],
+        post_scopes(instance.group_id, instance.author_id, instance.status)
+    )
+
+    saved_author = saved_state[1] if saved_state else None
+    if saved_author != instance.author_id:
+        if saved_author is not None:
+            change_stats(saved_author, POST_COUNT, -1)
+        change_stats(instance.author_id, POST_COUNT, 1)
+
+    was_published: bool = bool(
+        saved_state and saved_state[2] == ModeratedModel.PUBLISHED
+    )
+    engine: str = get_engine()
+    if engine == ENGINE_FANOUT:
+        if instance.is_published and not was_published:
+            fan_out(instance)
+        elif was_published and not instance.is_published:
+            withdraw(instance)
+    elif engine == ENGINE_PULL:
+        # Timeline the post is in, if any, before and after the change.
+        old_author = saved_state[1] if was_published else None
+        new_author = instance.author_id if instance.is_published else None
+        if old_author != new_author:
+            key = post_key(instance.pub_date, instance.pk)
+            if old_author is not None:
+                update_timeline(old_author, removed=key)
+            if new_author is not None:
+                update_timeline(new_author, added=key)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(instance, **kwargs):
+    """Drop the post from the counts, the stats and the timeline."""
+    update_counts(
+        post_scopes(instance.group_id, instance.author_id, instance.status),
+        []
+    )
+    change_stats(instance.author_id, POST_COUNT, -1)
+    if get_engine() == ENGINE_PULL and instance.is_published:
+        update_timeline(
+            instance.author_id,
+            removed=post_key(instance.pub_date, instance.pk)
+        )
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(instance, created, raw=False, **kwargs):
+    """Count the new follow and fill the feed with the author's posts."""
+    if created and not raw:
+        change_stats(instance.author_id, FOLLOWER_COUNT, 1)
+        change_stats(instance.user_id, FOLLOWING_COUNT, 1)
+        follow_added(instance.user_id, instance.author_id)
+        if get_engine() == ENGINE_FANOUT:
+            add_author(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(instance, **kwargs):
+    """Uncount the follow and drop the author's posts from the feed."""
+    change_stats(instance.author_id, FOLLOWER_COUNT, -1)
+    change_stats(instance.user_id, FOLLOWING_COUNT, -1)
+    follow_removed(instance.user_id, instance.author_id)
+    if get_engine() == ENGINE_FANOUT:
+        remove_author(instance.user_id, instance.author_id)
+        demote_author(instance.author_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(instance, created, raw=False, **kwargs):
+    """Start the stats of the new user."""
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user=instance)
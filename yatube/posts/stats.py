@@ -0,0 +1,119 @@
+"""In-process histograms of the censor pipeline timings."""
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Sequence
+
+from django.conf import settings
+
+from .utils import CallTimings
+
+SLOW_CALL_MS: float = 200.0
+TIME_BUCKETS_MS: Sequence[float] = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+)
+TOKEN_BUCKETS: Sequence[float] = (
+    10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+logger = logging.getLogger('posts.censor')
+
+
+class Histogram:
+    """Counts of values falling into buckets with the given upper bounds."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the percentile."""
+        rank: float = self.count * percent / 100
+        seen: int = 0
+
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, self.max)
+
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+            'buckets': dict(zip(
+                [str(bound) for bound in self.bounds] + ['inf'],
+                self.counts
+            )),
+        }
+
+
+class CensorStats:
+    """Per-stage wall time, tokens and stop list size of censor calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages = defaultdict(lambda: Histogram(TIME_BUCKETS_MS))
+            self.tokens = Histogram(TOKEN_BUCKETS)
+            self.stop_words: int = 0
+
+    def record(self, timings: CallTimings, text_length: int,
+               stop_words: int) -> None:
+        """Add the call to the histograms and log it if it is too slow."""
+        stages_ms: Dict[str, float] = {
+            name: seconds * 1000 for name, seconds in timings.stages.items()
+        }
+
+        with self._lock:
+            for name, milliseconds in stages_ms.items():
+                self.stages[name].add(milliseconds)
+            self.tokens.add(timings.counts['tokens'])
+            self.stop_words = stop_words
+
+        budget: float = getattr(settings, 'CENSOR_SLOW_CALL_MS', SLOW_CALL_MS)
+        if stages_ms.get('total', 0) > budget:
+            logger.warning(
+                'Slow censor call: %.1f ms, %d characters, %d tokens, '
+                '%d stop words, stages: %s',
+                stages_ms['total'],
+                text_length,
+                timings.counts['tokens'],
+                stop_words,
+                ', '.join(
+                    f'{name} {milliseconds:.1f} ms'
+                    for name, milliseconds in sorted(stages_ms.items())
+                ),
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'stages_ms': {
+                    name: histogram.as_dict()
+                    for name, histogram in sorted(self.stages.items())
+                },
+                'tokens': self.tokens.as_dict(),
+                'stop_words': self.stop_words,
+            }
+
+
+stats = CensorStats()
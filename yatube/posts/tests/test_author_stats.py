@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from ..author_stats import reconcile
+from ..models import AuthorStats, Follow, ModeratedModel, Post
+
+User = get_user_model()
+
+
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username='HasNoName')
+        cls.reader = User.objects.create(username='Reader')
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def stats(self, user):
+        stats = AuthorStats.objects.get(user=user)
+        return stats.post_count, stats.follower_count, stats.following_count
+
+    def test_stats_follow_changes(self):
+        """Posts and follows change the counters of both sides."""
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+        Post.objects.create(
+            text='На модерации',
+            author=self.author,
+            status=ModeratedModel.PENDING,
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertEqual(self.stats(self.author), (2, 1, 0))
+        self.assertEqual(self.stats(self.reader), (0, 0, 1))
+
+        post.author = self.reader
+        post.save()
+        follow.delete()
+
+        self.assertEqual(self.stats(self.author), (1, 0, 0))
+        self.assertEqual(self.stats(self.reader), (1, 0, 0))
+
+    def test_missing_stats_are_counted(self):
+        """Stats lost or drifted are recounted."""
+        Post.objects.create(text='Тестовый пост', author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        AuthorStats.objects.filter(user=self.author).delete()
+        AuthorStats.objects.filter(user=self.reader).update(post_count=5)
+
+        self.assertEqual(sum(reconcile(batch_size=1)), 2)
+        self.assertEqual(self.stats(self.author), (1, 1, 0))
+        self.assertEqual(self.stats(self.reader), (0, 0, 1))
+
+        AuthorStats.objects.filter(user=self.author).delete()
+        Post.objects.create(text='Новый пост', author=self.author)
+
+        self.assertEqual(self.stats(self.author), (2, 1, 0))
+
+    def test_pages_read_stats_with_author(self):
+        """Profile and post pages take the counters with the author."""
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+        client = Client()
+
+        with self.assertNumQueries(2):
+            # Post with the author and the stats, then the comments.
+            response = client.get(f'/posts/{post.pk}/')
+        self.assertContains(response, 'Всего постов автора:  <span >1')
+
+        response = client.get(f'/profile/{self.author.username}/')
+        self.assertContains(response, 'Всего постов: 1')
@@ -0,0 +1,392 @@
+import os
+import tempfile
+from difflib import SequenceMatcher
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..censor import (build_matcher, find_bad_spans, get_matcher,
+                      invalidate_matcher, warm_up)
+from ..models import CensoredWord
+from ..stats import stats
+from ..utils import (TOKEN_CYRILLIC, TOKEN_LATIN, TOKEN_OTHER,
+                     CensorMatcher, FuzzyIndex, StemAutomaton,
+                     VectorFuzzyIndex, bad_language_validation,
+                     classify_token, get_morph_analyzer, join_punctuation,
+                     lemma_cache_info, normalize_word, word_tokenize)
+
+SIMILARITY_THRESHOLD: float = 0.9
+
+
+class CensorMatcherTests(TestCase):
+    def test_matcher_masks_inflected_stop_word(self):
+        """Inflected form of a stop word is masked."""
+        matcher = CensorMatcher(['охотник'], SIMILARITY_THRESHOLD)
+
+        text, validation_error = matcher.validate('Там были охотники.')
+
+        self.assertTrue(validation_error)
+        self.assertEqual(text, 'Там были ********.')
+
+    def test_matcher_keeps_clean_text(self):
+        """Text without stop words is returned unchanged."""
+        matcher = CensorMatcher(['охотник'], SIMILARITY_THRESHOLD)
+
+        text, validation_error = matcher.validate('Там были рыбаки.')
+
+        self.assertFalse(validation_error)
+        self.assertEqual(text, 'Там были рыбаки.')
+
+    def test_matcher_keeps_original_layout(self):
+        """Only bad words are masked, spaces and line breaks are kept."""
+        matcher = CensorMatcher(['охотник'], SIMILARITY_THRESHOLD)
+        text = 'Там  были\nохотники , и рыбаки.'
+
+        self.assertEqual(matcher.find_bad_spans(text), [(10, 18)])
+        self.assertEqual(
+            matcher.validate(text),
+            ('Там  были\n******** , и рыбаки.', True)
+        )
+
+    def test_matcher_checks_only_changed_words(self):
+        """Edited text is checked around the changed words only."""
+        matcher = CensorMatcher(
+            ['охотник', 'серый волк'], SIMILARITY_THRESHOLD
+        )
+        clean_text = 'Серый и страшный волк ушёл.'
+
+        self.assertEqual(
+            matcher.find_changed_bad_spans(clean_text, 'Серый волк ушёл.'),
+            [(0, 5), (6, 10)]
+        )
+        self.assertEqual(
+            matcher.find_changed_bad_spans(
+                clean_text, 'Серый и страшный волк ушёл к охотникам.'
+            ),
+            [(29, 38)]
+        )
+
+    def test_bad_language_validation_matches_matcher(self):
+        """Function and matcher give the same verdict."""
+        text = 'Охотник пошёл в лес'
+        matcher = CensorMatcher(['охотник'], SIMILARITY_THRESHOLD)
+
+        self.assertEqual(
+            bad_language_validation(text, ['охотник'], SIMILARITY_THRESHOLD),
+            matcher.validate(text)
+        )
+
+
+class TokenizerTests(TestCase):
+    def test_word_tokenize_splits_punctuation(self):
+        """Words keep inner hyphens, punctuation marks are split off."""
+        self.assertEqual(
+            word_tokenize('Из-за леса, вышли охотники!'),
+            ['Из-за', 'леса', ',', 'вышли', 'охотники', '!']
+        )
+
+    def test_join_punctuation_restores_text(self):
+        """Tokens are joined back with punctuation glued to words."""
+        text = 'Из-за леса, вышли охотники...'
+
+        self.assertEqual(' '.join(join_punctuation(word_tokenize(text))), text)
+
+    def test_word_tokenize_keeps_links(self):
+        """Link is a single token without the trailing punctuation."""
+        self.assertEqual(
+            word_tokenize('См. https://example.com/a?b=1.'),
+            ['См', '.', 'https://example.com/a?b=1', '.']
+        )
+
+    def test_classify_token_by_script(self):
+        """Tokens are routed by their script."""
+        tokens = {
+            'Охотник': TOKEN_CYRILLIC,
+            'hunter': TOKEN_LATIN,
+            '2023': TOKEN_OTHER,
+            '!': TOKEN_OTHER,
+            'https://example.com': TOKEN_OTHER,
+        }
+
+        for token, kind in tokens.items():
+            with self.subTest(token=token):
+                self.assertEqual(classify_token(token), kind)
+
+    def test_non_russian_tokens_skip_morphology(self):
+        """Latin words, numbers and links are not parsed by pymorphy2."""
+        with mock.patch(
+            'posts.utils._normalize_russian_word'
+        ) as normalize_russian_word:
+            self.assertEqual(normalize_word('Hunters'), ('hunters', 'hunters'))
+            self.assertEqual(normalize_word('2023'), ('2023', '2023'))
+
+        normalize_russian_word.assert_not_called()
+
+
+class StemAutomatonTests(TestCase):
+    def test_automaton_finds_whole_stems(self):
+        """Stop stem equal to a word stem marks that word."""
+        automaton = StemAutomaton([['охотник']])
+
+        self.assertEqual(
+            automaton.find(['там', 'охотник', 'охотница']),
+            {1}
+        )
+
+    def test_automaton_finds_phrases(self):
+        """Stop phrase marks all of its words and only in that order."""
+        automaton = StemAutomaton([['сер', 'волк']])
+
+        self.assertEqual(
+            automaton.find(['сер', 'волк', 'и', 'волк', 'сер']),
+            {0, 1}
+        )
+
+    def test_automaton_finds_long_stems_inside_compound_words(self):
+        """Long stop stem glued inside a word marks that word."""
+        automaton = StemAutomaton([['охотник'], ['лес']], min_infix_length=5)
+
+        self.assertEqual(
+            automaton.find(['суперохотник', 'лесник', 'лес']),
+            {0, 2}
+        )
+
+    def test_matcher_masks_phrase(self):
+        """Multi-word censored entry is masked as a whole."""
+        matcher = CensorMatcher(['серый волк'], SIMILARITY_THRESHOLD)
+
+        text, validation_error = matcher.validate('Пришёл серый волк.')
+
+        self.assertTrue(validation_error)
+        self.assertEqual(text, 'Пришёл ***** ****.')
+
+
+class FuzzyIndexTests(TestCase):
+    def test_fuzzy_index_matches_quick_ratio(self):
+        """Index gives the same verdicts as the quick_ratio() loop."""
+        stems = ['охотник', 'рыбак', 'лесник', 'охот', 'ра', 'абвгд']
+        words = ['охотнк', 'охотники', 'рыба', 'ар', 'лес', 'дгвба', 'абв']
+
+        for threshold in (0.5, 0.75, 0.8, 0.9):
+            index = FuzzyIndex(stems, threshold)
+            for word in words:
+                with self.subTest(threshold=threshold, word=word):
+                    self.assertEqual(
+                        index.is_similar(word),
+                        any(
+                            SequenceMatcher(None, stem, word).quick_ratio()
+                            > threshold for stem in stems
+                        )
+                    )
+
+    def test_vector_fuzzy_index_matches_quick_ratio(self):
+        """NumPy engine gives the same verdicts as the quick_ratio() loop."""
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest('NumPy is not installed')
+
+        stems = ['охотник', 'рыбак', 'лесник', 'охот', 'ра', 'абвгд']
+        words = ['охотнк', 'охотники', 'рыба', 'ар', 'лес', 'дгвба', 'x']
+
+        for threshold in (0.5, 0.75, 0.8, 0.9):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(
+                    VectorFuzzyIndex(stems, threshold).find_similar(words),
+                    FuzzyIndex(stems, threshold).find_similar(words)
+                )
+
+
+class NormalFormCacheTests(TestCase):
+    def test_analyzer_is_shared(self):
+        """Morphological analyzer is created once per process."""
+        self.assertIs(get_morph_analyzer(), get_morph_analyzer())
+
+    def test_repeated_word_hits_cache(self):
+        """Repeated word is taken from the cache in any case."""
+        normalize_word('Охотниками')
+        hits_before: int = lemma_cache_info().hits
+
+        self.assertEqual(normalize_word('охотниками')[0], 'охотник')
+        self.assertEqual(lemma_cache_info().hits, hits_before + 1)
+
+
+class CensorMatcherCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        invalidate_matcher()
+
+    def tearDown(self) -> None:
+        invalidate_matcher()
+
+    def test_matcher_is_built_once(self):
+        """Matcher is reused while the stop list does not change."""
+        self.assertIs(get_matcher(), get_matcher())
+
+    def test_matcher_is_rebuilt_on_stop_list_change(self):
+        """Saving and deleting censored words rebuilds the matcher."""
+        matcher = get_matcher()
+        word = CensoredWord.objects.create(word='охотник')
+        matcher_after_save = get_matcher()
+
+        self.assertIsNot(matcher, matcher_after_save)
+        self.assertTrue(matcher_after_save.validate('охотники')[1])
+
+        word.delete()
+
+        self.assertFalse(get_matcher().validate('охотники')[1])
+
+    @override_settings(CENSOR_VERSION_TTL=0)
+    def test_matcher_follows_stop_list_in_database(self):
+        """Stop list changed by another process rebuilds the matcher."""
+        word = CensoredWord.objects.create(word='охотник')
+        get_matcher()
+
+        # Sends no signals, like a change made through another worker.
+        CensoredWord.objects.filter(pk=word.pk).update(word='рыбак')
+
+        self.assertTrue(get_matcher().validate('рыбаки')[1])
+
+    @mock.patch('posts.censor.connections')
+    @mock.patch('posts.censor.gc.freeze')
+    def test_warm_up_builds_matcher(self, freeze, connections):
+        """Matcher built by the warm up is reused by the checks."""
+        warm_up()
+
+        with mock.patch('posts.censor.CensorMatcher') as matcher_class:
+            get_matcher()
+        matcher_class.assert_not_called()
+        freeze.assert_called_once()
+        # Forked workers must not share the connection of the master.
+        connections.close_all.assert_called_once()
+
+    @override_settings(CENSOR_WARM_UP=False)
+    def test_warm_up_can_be_turned_off(self):
+        """Nothing is loaded when the warm up is turned off."""
+        warm_up()
+
+        with mock.patch('posts.censor.CensorMatcher') as matcher_class:
+            get_matcher()
+        matcher_class.assert_called_once()
+
+    def test_censored_word_is_expanded_into_forms(self):
+        """Saved censored word gets all its inflected forms."""
+        word = CensoredWord.objects.create(word='охотник')
+
+        self.assertIn('охотниками', word.forms.values_list('form', flat=True))
+        self.assertEqual(
+            set(word.forms.values_list('stem', flat=True)),
+            {'охотник'}
+        )
+
+    def test_matcher_finds_stored_forms(self):
+        """Matcher marks stored forms without morphological analysis."""
+        matcher = CensorMatcher(
+            [], SIMILARITY_THRESHOLD, word_forms=[('волчара', 'волк')]
+        )
+
+        self.assertEqual(
+            matcher.validate('Вот волчара!'),
+            ('Вот *******!', True)
+        )
+
+    def test_verdict_is_cached_until_stop_list_changes(self):
+        """Same text is checked once per version of the stop list."""
+        text = 'Охотники вышли из леса'
+
+        self.assertEqual(find_bad_spans(text), [])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(find_bad_spans(text), [])
+
+        CensoredWord.objects.create(word='охотник')
+
+        self.assertEqual(find_bad_spans(text), [(0, 8)])
+
+    def test_edited_text_is_checked_incrementally(self):
+        """Only changed words of a clean text are sent to the matcher."""
+        CensoredWord.objects.create(word='охотник')
+        clean_text = 'Волки вышли из леса'
+        find_bad_spans(clean_text)
+
+        with mock.patch.object(
+            CensorMatcher, 'find_bad_words', autospec=True,
+            side_effect=CensorMatcher.find_bad_words
+        ) as find_bad_words:
+            spans = find_bad_spans('Охотники вышли из леса', clean_text)
+
+        self.assertEqual(spans, [(0, 8)])
+        find_bad_words.assert_called_once_with(mock.ANY, ['Охотники'])
+
+
+class CensorStatsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        stats.reset()
+
+    def test_check_is_recorded_by_stages(self):
+        """Every stage of the check gets into the histograms."""
+        find_bad_spans('Охотники вышли из леса.')
+        snapshot = stats.snapshot()
+
+        for name in ('total', 'tokenize', 'normalize', 'match', 'fuzzy'):
+            with self.subTest(stage=name):
+                self.assertEqual(snapshot['stages_ms'][name]['count'], 1)
+        self.assertEqual(snapshot['tokens']['max'], 5)
+
+    @override_settings(CENSOR_SLOW_CALL_MS=0)
+    def test_slow_check_is_logged(self):
+        """Check over the budget is logged with its stages."""
+        with self.assertLogs('posts.censor', 'WARNING') as logs:
+            find_bad_spans('Охотники вышли из леса.')
+
+        self.assertIn('tokenize', logs.output[0])
+
+
+class CensorIndexTests(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'censor.index')
+        settings_override = override_settings(CENSOR_INDEX_PATH=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        CensoredWord.objects.create(word='охотник')
+        CensoredWord.objects.create(word='плохое слово')
+
+    def build_index(self):
+        call_command('build_censor_index', stdout=StringIO())
+
+    def test_matcher_is_loaded_without_normalizing_stop_list(self):
+        """Fresh index gives the same verdicts without the morphology."""
+        self.build_index()
+
+        with mock.patch('posts.utils.normalize_words') as normalize_words:
+            matcher = build_matcher()
+        normalize_words.assert_not_called()
+
+        self.assertEqual(
+            matcher.find_bad_spans('Охотники сказали плохие слова'),
+            [(0, 8), (17, 23), (24, 29)]
+        )
+        self.assertEqual(matcher.stop_words_count, 2)
+
+    def test_stale_index_is_not_used(self):
+        """Words added after the index was built are still found."""
+        self.build_index()
+        CensoredWord.objects.create(word='рыбак')
+
+        self.assertTrue(build_matcher().validate('рыбаки')[1])
+
+    def test_damaged_index_is_not_used(self):
+        """Damaged index is logged and the stop list is compiled again."""
+        with open(self.path, 'wb') as index_file:
+            index_file.write(b'YCENSIDX')
+
+        with self.assertLogs('posts.censor', 'WARNING'):
+            matcher = build_matcher()
+
+        self.assertTrue(matcher.validate('охотники')[1])
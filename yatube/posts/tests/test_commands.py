@@ -0,0 +1,205 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..censor import get_version, invalidate_matcher
+from ..counts import SCOPE_ALL, get_post_count
+from ..feed import get_feed
+from ..management.commands import rescan_censorship
+from ..models import AuthorStats, CensoredWord, Follow, Post
+
+User = get_user_model()
+
+
+class RescanCensorshipTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(username='HasNoName')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.clean_post = Post.objects.create(
+            text='Рыбаки вышли из леса',
+            author=self.user,
+        )
+        self.bad_post = Post.objects.create(
+            text='Охотники  вышли из леса',
+            author=self.user,
+        )
+        CensoredWord.objects.create(word='охотник')
+
+    def tearDown(self) -> None:
+        invalidate_matcher()
+
+    def rescan(self, **options):
+        call_command(
+            'rescan_censorship', model=['posts'], workers=1,
+            stdout=StringIO(), **options
+        )
+        self.clean_post.refresh_from_db()
+        self.bad_post.refresh_from_db()
+
+    def test_rescan_rejects_posts_with_bad_words(self):
+        """Posts with new stop words are rejected."""
+        self.rescan(chunk_size=1)
+
+        self.assertEqual(self.clean_post.status, Post.PUBLISHED)
+        self.assertEqual(self.bad_post.status, Post.REJECTED)
+
+    def test_rescan_updates_counts_and_feeds(self):
+        """Rejected posts leave the cached counts and the follow feeds."""
+        reader = User.objects.create(username='Reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.assertEqual(get_post_count(SCOPE_ALL), 2)
+
+        self.rescan()
+
+        self.assertEqual(get_post_count(SCOPE_ALL), 1)
+        self.assertEqual(
+            get_feed(reader)[:], [self.clean_post]
+        )
+
+    def test_rescan_masks_bad_words(self):
+        """Bad words are replaced with asterisks in the original text."""
+        self.rescan(mask=True)
+
+        self.assertEqual(self.bad_post.text, '********  вышли из леса')
+        self.assertEqual(self.bad_post.status, Post.PUBLISHED)
+
+    def test_rescan_skips_texts_edited_after_scan(self):
+        """Spans found in the scanned text are not applied to a new one."""
+        scan = rescan_censorship._find_bad_spans_many
+
+        def scan_and_edit(texts):
+            spans = scan(texts)
+            Post.objects.filter(pk=self.bad_post.pk).update(
+                text='Охотники вышли из леса'
+            )
+            return spans
+
+        with mock.patch.object(
+            rescan_censorship, '_find_bad_spans_many', scan_and_edit
+        ):
+            self.rescan(mask=True)
+
+        self.assertEqual(self.bad_post.text, 'Охотники вышли из леса')
+
+    def test_rescan_resumes_from_checkpoint(self):
+        """Rows up to the saved id are skipped, the new id is saved."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+            with open(path, 'w') as checkpoint_file:
+                json.dump(
+                    {'version': get_version(), 'posts': self.bad_post.pk},
+                    checkpoint_file
+                )
+            newest_post = Post.objects.create(
+                text='Охотник вернулся',
+                author=self.user,
+            )
+
+            self.rescan(checkpoint=path)
+
+            with open(path) as checkpoint_file:
+                self.assertEqual(
+                    json.load(checkpoint_file),
+                    {'version': get_version(), 'posts': newest_post.pk}
+                )
+
+        newest_post.refresh_from_db()
+        self.assertEqual(self.bad_post.status, Post.PUBLISHED)
+        self.assertEqual(newest_post.status, Post.REJECTED)
+
+    def test_rescan_starts_over_after_stop_list_change(self):
+        """Checkpoint of another stop list is not resumed from."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+            with open(path, 'w') as checkpoint_file:
+                json.dump(
+                    {'version': 'old', 'posts': self.bad_post.pk},
+                    checkpoint_file
+                )
+
+            self.rescan(checkpoint=path)
+
+        self.assertEqual(self.bad_post.status, Post.REJECTED)
+
+
+class ReconcileAuthorStatsTests(TestCase):
+    def test_drifted_stats_are_repaired(self):
+        """Command recounts the stats and reports the repaired ones."""
+        user = User.objects.create(username='HasNoName')
+        Post.objects.create(text='Тестовый пост', author=user)
+        AuthorStats.objects.filter(user=user).update(post_count=0)
+        out = StringIO()
+
+        call_command('reconcile_author_stats', stdout=out)
+
+        self.assertEqual(AuthorStats.objects.get(user=user).post_count, 1)
+        self.assertIn('Repaired stats of 1 authors', out.getvalue())
+
+
+class CensorStatsCommandTests(TestCase):
+    def test_command_prints_stages_and_slowest_texts(self):
+        """Command prints the stage histograms and the slowest texts."""
+        user = User.objects.create(username='HasNoName')
+        post = Post.objects.create(text='Охотники вышли из леса', author=user)
+        stdout = StringIO()
+
+        call_command('censor_stats', json=True, stdout=stdout)
+        snapshot = json.loads(stdout.getvalue())
+
+        self.assertEqual(snapshot['stages_ms']['total']['count'], 1)
+        self.assertEqual(snapshot['slowest'][0]['id'], post.pk)
+
+
+class CensorBenchmarkTests(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = os.path.join(directory.name, 'benchmark.json')
+        self.options = {
+            'stop_words': [10],
+            'lengths': [100],
+            'texts': 3,
+            'repeat': 1,
+            'output': self.output,
+            'stdout': StringIO(),
+        }
+
+    def test_results_are_written_as_json(self):
+        """Every case gets throughput, latency and memory."""
+        call_command('censor_benchmark', **self.options)
+
+        with open(self.output) as output_file:
+            case = json.load(output_file)['cases']['stop_words=10 length=100']
+
+        self.assertEqual(case['stop_words'], 10)
+        self.assertGreater(case['tokens_per_second'], 0)
+        self.assertIn('p95', case['latency_ms'])
+        self.assertGreater(case['peak_memory_kb'], 0)
+
+    def test_regression_against_baseline_fails(self):
+        """Command fails when throughput drops below the baseline."""
+        call_command('censor_benchmark', **self.options)
+        with open(self.output) as output_file:
+            baseline = json.load(output_file)
+        for case in baseline['cases'].values():
+            case['tokens_per_second'] *= 100
+        baseline_path = os.path.join(os.path.dirname(self.output), 'base.json')
+        with open(baseline_path, 'w') as baseline_file:
+            json.dump(baseline, baseline_file)
+
+        with self.assertRaisesMessage(CommandError, 'tokens/s'):
+            call_command(
+                'censor_benchmark', baseline=baseline_path, **self.options
+            )
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..counts import (SCOPE_ALL, SCOPE_AUTHOR, SCOPE_AUTHOR_ALL, SCOPE_GROUP,
+                      get_follow_count, get_post_count)
+from ..models import Follow, Group, ModeratedModel, Post
+
+User = get_user_model()
+
+
+class PostCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='some-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый пост',
+            author=self.user,
+            group=self.group,
+        )
+
+    def counts(self):
+        return {
+            SCOPE_ALL: get_post_count(SCOPE_ALL),
+            SCOPE_GROUP: get_post_count(SCOPE_GROUP, self.group.pk),
+            'other_group': get_post_count(SCOPE_GROUP, self.other_group.pk),
+            SCOPE_AUTHOR: get_post_count(SCOPE_AUTHOR, self.user.pk),
+            SCOPE_AUTHOR_ALL: get_post_count(SCOPE_AUTHOR_ALL, self.user.pk),
+        }
+
+    def test_count_is_cached(self):
+        """Scope is counted once, then the cached number is used."""
+        self.counts()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_post_count(SCOPE_ALL), 1)
+
+    def test_counts_follow_post_changes(self):
+        """Saving and deleting posts updates cached counts in place."""
+        self.counts()
+        post = Post.objects.create(text='Новый пост', author=self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), {
+                SCOPE_ALL: 2, SCOPE_GROUP: 1, 'other_group': 0,
+                SCOPE_AUTHOR: 2, SCOPE_AUTHOR_ALL: 2,
+            })
+
+        post.group = self.other_group
+        post.status = ModeratedModel.PENDING
+        post.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), {
+                SCOPE_ALL: 1, SCOPE_GROUP: 1, 'other_group': 0,
+                SCOPE_AUTHOR: 1, SCOPE_AUTHOR_ALL: 2,
+            })
+
+        post.status = ModeratedModel.PUBLISHED
+        post.save()
+        self.post.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), {
+                SCOPE_ALL: 1, SCOPE_GROUP: 0, 'other_group': 1,
+                SCOPE_AUTHOR: 1, SCOPE_AUTHOR_ALL: 1,
+            })
+
+    def test_follow_count_sums_authors(self):
+        """Follow feed is counted from the counts of its authors."""
+        reader = User.objects.create(username='Reader')
+        other_author = User.objects.create(username='OtherAuthor')
+        Post.objects.create(text='Чужой пост', author=other_author)
+        Follow.objects.create(user=reader, author=self.user)
+        Follow.objects.create(user=reader, author=other_author)
+
+        self.assertEqual(get_follow_count(reader), 2)
+
+        Post.objects.create(text='Ещё пост', author=other_author)
+
+        self.assertEqual(get_follow_count(reader), 3)
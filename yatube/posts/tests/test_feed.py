@@ -0,0 +1,238 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_encode
+
+from ..checks import check_timeline_cache
+from ..feed import ENGINE_FANOUT, ENGINE_PULL, get_feed
+from ..models import FeedEntry, Follow, ModeratedModel, Post
+from ..timelines import Timeline, get_timelines
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username='HasNoName')
+        cls.reader = User.objects.create(username='Reader')
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def feed(self, user=None):
+        return get_feed(user or self.reader)[:]
+
+    def test_published_post_is_written_to_feeds(self):
+        """New post goes to the feeds of the author's followers only."""
+        stranger = User.objects.create(username='Stranger')
+        Follow.objects.create(user=self.reader, author=self.author)
+
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+
+        self.assertEqual(self.feed(), [post])
+        self.assertEqual(self.feed(stranger), [])
+
+    def test_follow_fills_and_unfollow_prunes_feed(self):
+        """Following adds the author's posts, unfollowing removes them."""
+        older = Post.objects.create(text='Старый пост', author=self.author)
+        newer = Post.objects.create(text='Новый пост', author=self.author)
+        Post.objects.create(
+            text='На модерации',
+            author=self.author,
+            status=ModeratedModel.PENDING,
+        )
+
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertEqual(self.feed(), [newer, older])
+
+        follow.delete()
+
+        self.assertEqual(self.feed(), [])
+
+    def test_unpublished_post_leaves_feeds(self):
+        """Rejected post is removed from feeds, published again it returns."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+
+        post.status = ModeratedModel.REJECTED
+        post.save()
+
+        self.assertEqual(self.feed(), [])
+
+        post.status = ModeratedModel.PUBLISHED
+        post.save()
+
+        self.assertEqual(self.feed(), [post])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_popular_author_is_merged_on_read(self):
+        """Posts of popular authors are not copied but shown on reading."""
+        other_author = User.objects.create(username='OtherAuthor')
+        Follow.objects.create(user=self.reader, author=self.author)
+        first = Post.objects.create(text='Первый пост', author=self.author)
+        Follow.objects.create(user=self.reader, author=other_author)
+        second = Post.objects.create(text='Второй пост', author=self.author)
+
+        self.assertEqual(self.feed(), [second, first])
+
+        # The post published again keeps its place in the feed.
+        first.status = ModeratedModel.PENDING
+        first.save()
+        self.assertEqual(self.feed(), [second])
+        first.status = ModeratedModel.PUBLISHED
+        first.save()
+        self.assertEqual(self.feed(), [second, first])
+
+        self.assertFalse(
+            FeedEntry.objects.filter(author=self.author).exists()
+        )
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_author_losing_popularity_is_copied(self):
+        """Posts of the author who is not popular anymore are copied."""
+        stranger = User.objects.create(username='Stranger')
+        Follow.objects.create(user=self.reader, author=self.author)
+        follow = Follow.objects.create(user=stranger, author=self.author)
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+
+        self.assertFalse(FeedEntry.objects.exists())
+
+        follow.delete()
+
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed(), [post])
+
+
+@override_settings(FEED_ENGINE=ENGINE_PULL)
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username='HasNoName')
+        cls.other_author = User.objects.create(username='OtherAuthor')
+        cls.reader = User.objects.create(username='Reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.other_author)
+
+    def setUp(self) -> None:
+        cache.clear()
+        for i in range(13):
+            Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=(self.author, self.other_author)[i % 2],
+            )
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def feed(self):
+        return list(Timeline(get_timelines(
+            [self.author.pk, self.other_author.pk]
+        ))[:])
+
+    def test_timelines_are_merged_newest_first(self):
+        """Numbered and cursor pages go through all posts in order."""
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+        second_page = self.client.get('/follow/', {'page': 2}).context[
+            'page_obj'
+        ]
+        self.assertEqual(
+            [post.pk for post in second_page], expected[10:]
+        )
+
+        seen = []
+        cursor = ''
+        while True:
+            page_obj = self.client.get(
+                '/follow/', {'after': cursor}
+            ).context['page_obj']
+            seen.extend(post.pk for post in page_obj)
+            if not page_obj.has_next():
+                break
+            cursor = page_obj.next_cursor
+        self.assertEqual(seen, expected)
+
+        back_page = self.client.get(
+            '/follow/', {'before': page_obj.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual([post.pk for post in back_page], expected[:10])
+
+    def test_cached_timelines_follow_post_changes(self):
+        """Cached timelines take new, rejected and deleted posts in place."""
+        self.feed()
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        newest = Post.objects.order_by('-pub_date', '-pk')[1]
+
+        self.assertEqual(self.feed()[:2], [post, newest])
+
+        post.status = ModeratedModel.REJECTED
+        post.save()
+        self.assertEqual(self.feed()[0], newest)
+
+        newest.delete()
+        self.assertNotIn(newest, self.feed())
+        self.assertEqual(len(self.feed()), 12)
+
+    def test_cursor_with_naive_date_is_broken(self):
+        """Cursor with a date without a time zone gives page one."""
+        token = urlsafe_base64_encode(
+            f'{timezone.now().replace(tzinfo=None).isoformat()} 1'.encode()
+        )
+        first_page = list(Post.objects.order_by('-pub_date', '-pk')[:10])
+
+        for direction in ('after', 'before'):
+            with self.subTest(direction=direction):
+                response = self.client.get('/follow/', {direction: token})
+
+                self.assertEqual(
+                    list(response.context['page_obj']), first_page
+                )
+
+    @override_settings(FEED_TIMELINE_LENGTH=3)
+    def test_page_is_built_from_cache(self):
+        """Cached timelines are merged without joining the follows."""
+        self.client.get('/follow/')
+
+        with self.assertNumQueries(3):
+            # Session, user and the posts of the page.
+            response = self.client.get('/follow/')
+        self.assertEqual(len(response.context['page_obj']), 6)
+
+    def test_process_cache_is_refused(self):
+        """Timelines are kept only in a cache shared by the processes."""
+        self.assertEqual(
+            [error.id for error in check_timeline_cache(None)],
+            ['posts.E001']
+        )
+
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.'
+                       'MemcachedCache',
+        }}):
+            self.assertEqual(check_timeline_cache(None), [])
+
+    def test_feed_table_is_not_written(self):
+        """Pull engine writes no feed entries, rebuild_feeds fills them."""
+        self.assertFalse(FeedEntry.objects.exists())
+
+        with override_settings(FEED_ENGINE=ENGINE_FANOUT):
+            call_command('rebuild_feeds', stdout=StringIO())
+            self.assertEqual(
+                get_feed(self.reader)[:],
+                list(Post.objects.order_by('-pub_date', '-pk'))
+            )
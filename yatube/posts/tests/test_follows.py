@@ -0,0 +1,96 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from ..follows import follower_count, following_ids, is_following
+from ..models import AuthorStats, Follow
+
+User = get_user_model()
+
+
+class FollowGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.reader = User.objects.create(username='Reader')
+        cls.authors = [
+            User.objects.create(username=f'Author{i}') for i in range(3)
+        ]
+
+    def setUp(self) -> None:
+        cache.clear()
+        Follow.objects.create(user=self.reader, author=self.authors[2])
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+
+    def test_graph_is_loaded_once(self):
+        """Following set is sorted and answered from the cache."""
+        self.assertEqual(
+            list(following_ids(self.reader.pk)),
+            [self.authors[0].pk, self.authors[2].pk]
+        )
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_following(self.reader.pk, self.authors[0].pk))
+            self.assertFalse(
+                is_following(self.reader.pk, self.authors[1].pk)
+            )
+
+    def test_graph_follows_changes(self):
+        """Follows and unfollows update the graph and the follower counts."""
+        following_ids(self.reader.pk)
+        self.assertEqual(follower_count(self.authors[1].pk), 0)
+
+        Follow.objects.create(user=self.reader, author=self.authors[1])
+        Follow.objects.get(user=self.reader, author=self.authors[0]).delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(following_ids(self.reader.pk)),
+                [self.authors[1].pk, self.authors[2].pk]
+            )
+        self.assertEqual(follower_count(self.authors[1].pk), 1)
+        self.assertEqual(follower_count(self.authors[0].pk), 0)
+
+    def test_follower_counts_are_cached(self):
+        """Numbers of followers are read from the stats once."""
+        self.assertEqual(follower_count(self.authors[0].pk), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(follower_count(self.authors[0].pk), 1)
+
+    def test_changes_made_elsewhere_are_seen_after_timeout(self):
+        """Follows which did not update this cache are seen soon."""
+        self.assertFalse(is_following(self.reader.pk, self.authors[1].pk))
+        self.assertEqual(follower_count(self.authors[1].pk), 0)
+
+        # Another process with its own cache follows the author.
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, author=self.authors[1])]
+        )
+        AuthorStats.objects.filter(user=self.authors[1]).update(
+            follower_count=1
+        )
+
+        later: float = time.time() + settings.FOLLOWS_GRAPH_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            self.assertTrue(
+                is_following(self.reader.pk, self.authors[1].pk)
+            )
+            self.assertEqual(follower_count(self.authors[1].pk), 1)
+
+    def test_profile_checks_follow_without_query(self):
+        """Profile page takes the follow button state from the graph."""
+        client = Client()
+        client.force_login(self.reader)
+        address = f'/profile/{self.authors[0].username}/'
+        client.get(address)
+
+        with self.assertNumQueries(3):
+            # Session, user and author, who has no posts to fetch.
+            response = client.get(address)
+        self.assertTrue(response.context['following'])
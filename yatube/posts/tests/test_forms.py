@@ -304,3 +304,22 @@ class PostFormCreateEditTests(TestCase):
             comments_nbr_before_creation,
             comments_nbr_after_creation
         )
+
+    def test_add_comment_to_unpublished_post(self):
+        """Unpublished post can not be commented by other users."""
+        special_post = Post.objects.create(
+            text='Особый пост для всяческих тестовых нужд.',
+            author=self.user_not_author,
+            group=self.group,
+            status=Post.PENDING,
+        )
+
+        response = self.authorized_client.post(
+            reverse(
+                'posts:add_comment', args=[special_post.id]
+            ),
+            {'text': 'Комментарий который точно пройдёт валидацию'}
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertFalse(Comment.objects.filter(post=special_post).exists())
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.sites import site
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..censor import find_bad_spans, invalidate_matcher
+from ..moderation import process_tasks
+from ..models import CensoredWord, Comment, ModerationTask, Post
+
+User = get_user_model()
+
+
+@override_settings(CENSOR_DEFERRED=True)
+class DeferredModerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(username='HasNoName')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+        cls.post = Post.objects.create(
+            text='Опубликованный пост',
+            author=cls.user,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        invalidate_matcher()
+        CensoredWord.objects.create(word='охотник')
+
+    def tearDown(self) -> None:
+        invalidate_matcher()
+
+    def test_post_waits_for_moderation(self):
+        """New post is hidden from the index until the worker checks it."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Охотники вышли из леса'},
+        )
+        post = Post.objects.get(text='Охотники вышли из леса')
+
+        self.assertEqual(post.status, Post.PENDING)
+        self.assertEqual(ModerationTask.objects.get().post, post)
+        self.assertNotIn(
+            post,
+            self.client.get(reverse('posts:index')).context['page_obj']
+        )
+
+        call_command('moderation_worker', once=True, stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, Post.REJECTED)
+        self.assertFalse(ModerationTask.objects.exists())
+
+    def test_clean_comment_is_published_by_worker(self):
+        """Clean comment is published by the worker."""
+        self.authorized_client.post(
+            reverse('posts:add_comment', args=[self.post.id]),
+            data={'text': 'Рыбаки вышли из леса'},
+        )
+        comment = Comment.objects.get()
+
+        self.assertEqual(comment.status, Comment.PENDING)
+
+        call_command('moderation_worker', once=True, stdout=StringIO())
+
+        comment.refresh_from_db()
+        self.assertEqual(comment.status, Comment.PUBLISHED)
+
+    def test_failed_text_does_not_block_batch(self):
+        """Failure of one check is retried alone, others are moderated."""
+        for text in ('Сломанный пост', 'Рыбаки вышли из леса'):
+            self.authorized_client.post(
+                reverse('posts:post_create'), data={'text': text}
+            )
+
+        def check(text, *args, **kwargs):
+            if text == 'Сломанный пост':
+                raise RuntimeError('Broken dictionary')
+            return find_bad_spans(text, *args, **kwargs)
+
+        with mock.patch('posts.moderation.find_bad_spans', check), \
+                self.assertLogs('posts.moderation', 'ERROR'):
+            self.assertEqual(process_tasks(), 2)
+            self.assertEqual(process_tasks(), 1)
+            self.assertEqual(process_tasks(), 1)
+            self.assertEqual(process_tasks(), 0)
+
+        self.assertEqual(
+            Post.objects.get(text='Рыбаки вышли из леса').status,
+            Post.PUBLISHED
+        )
+        broken = Post.objects.get(text='Сломанный пост')
+        self.assertEqual(broken.status, Post.PENDING)
+        # The task is left for the admin, which queues it again.
+        task = ModerationTask.objects.get(post=broken)
+        self.assertEqual(task.attempts, 3)
+
+        site._registry[ModerationTask].requeue(
+            None, ModerationTask.objects.all()
+        )
+        self.assertEqual(process_tasks(), 1)
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, Post.PUBLISHED)
+
+    def test_task_is_claimed_once(self):
+        """Task read by two workers is moderated by one of them only."""
+        self.authorized_client.post(
+            reverse('posts:post_create'), data={'text': 'Рыбаки'}
+        )
+        task = ModerationTask.objects.get()
+        # Another worker has claimed the task after this one read it.
+        ModerationTask.objects.filter(pk=task.pk).update(
+            claimed_at=timezone.now()
+        )
+
+        with mock.patch(
+            'posts.moderation._queued_tasks', return_value=[task]
+        ), mock.patch('posts.moderation.moderate') as moderate:
+            self.assertEqual(process_tasks(), 0)
+        moderate.assert_not_called()
+
+    def test_task_of_dead_worker_is_taken_again(self):
+        """Claimed task stays queued and is taken after its lease runs out."""
+        self.authorized_client.post(
+            reverse('posts:post_create'), data={'text': 'Рыбаки'}
+        )
+        # The worker which claimed the task died before moderating it.
+        with mock.patch('posts.moderation.moderate', side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                process_tasks()
+
+        self.assertEqual(process_tasks(), 0)
+
+        ModerationTask.objects.update(
+            claimed_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(process_tasks(), 1)
+        self.assertEqual(Post.objects.get(text='Рыбаки').status,
+                         Post.PUBLISHED)
+        self.assertFalse(ModerationTask.objects.exists())
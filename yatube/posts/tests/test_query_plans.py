@@ -0,0 +1,90 @@
+import re
+from typing import List
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+# Full scan of a posts table or a sort the indexes were meant to avoid.
+BAD_PLAN_RE = re.compile(
+    r'^SCAN (TABLE )?'
+    r'(posts_post|posts_comment|posts_follow|posts_feedentry)\b(?!.* USING )'
+    r'|USE TEMP B-TREE',
+)
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create(username='HasNoName')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='some-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post,
+            author=cls.reader,
+            text='Тестовый комментарий',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self) -> None:
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are checked with SQLite EXPLAIN QUERY PLAN.')
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def explain(self, sql: str) -> List[str]:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_list_views_use_indexes(self):
+        """Queries of the views neither scan posts tables nor sort rows."""
+        addresses = (
+            '/',
+            '/?page=2',
+            '/?after=',
+            '/group/some-slug/',
+            '/profile/HasNoName/',
+            '/profile/HasNoName/?after=',
+            f'/posts/{self.post.pk}/',
+            '/follow/',
+            '/follow/?after=',
+        )
+
+        self.assertUseIndexes(addresses)
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_feed_of_popular_authors_uses_indexes(self):
+        """Posts merged into the feed on read are read from an index."""
+        self.assertUseIndexes(('/follow/', '/follow/?after='))
+
+    def assertUseIndexes(self, addresses):
+        for address in addresses:
+            with self.subTest(address=address):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(address)
+
+                for query in queries:
+                    if not query['sql'].startswith('SELECT'):
+                        continue
+                    bad_plan = [
+                        detail for detail in self.explain(query['sql'])
+                        if BAD_PLAN_RE.search(detail)
+                    ]
+                    self.assertEqual(bad_plan, [], query['sql'])
@@ -1,17 +1,25 @@
 import shutil
 import tempfile
+import warnings
 from typing import List
+from unittest import mock
 
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_encode
 
+from ..counts import COUNT_KEY, SCOPE_ALL
 from ..forms import CommentForm
 from ..models import Comment, Follow, Group, Post
+from ..pagination import encode_cursor
 
 User = get_user_model()
 NUMBER_OF_POSTS: int = 15
@@ -453,3 +461,164 @@ class PaginatorTest(TestCase):
             total_posts_on_page,
             EXPECTED_POSTS_NUMBER
         )
+
+    def test_cursor_pages_on_list_pages(self):
+        """Cursor pages go through all the posts without counting them."""
+        Follow.objects.create(author=self.user, user=self.user_not_author)
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+        count_queries = {
+            '/': 0,
+            '/group/some-slug/': 0,
+            '/profile/HasNoName/': 0,
+            '/follow/': 0,
+        }
+
+        for address, count_query in count_queries.items():
+            with self.subTest(address=address):
+                seen: List[int] = []
+                cursor = ''
+                with CaptureQueriesContext(connection) as queries:
+                    while True:
+                        page_obj = self.authorized_client_not_author.get(
+                            address, {'after': cursor}
+                        ).context['page_obj']
+                        seen.extend(post.pk for post in page_obj)
+                        if not page_obj.has_next():
+                            break
+                        cursor = page_obj.next_cursor
+
+                sql: List[str] = [query['sql'] for query in queries]
+                self.assertEqual(seen, expected)
+                self.assertFalse(any('OFFSET' in query for query in sql))
+                self.assertEqual(
+                    sum('COUNT(' in query for query in sql), count_query
+                )
+
+    def test_empty_numbered_page_with_stale_count(self):
+        """Page emptied by a count ahead of the posts gets no cursor."""
+        cache.set(COUNT_KEY.format(scope=SCOPE_ALL, pk=None), 200)
+
+        response = self.guest_client.get('/', {'page': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.assertFalse(hasattr(response.context['page_obj'], 'next_cursor'))
+
+    def test_cursor_with_huge_id_is_broken(self):
+        """Cursor with an id out of the database range gives page one."""
+        token = urlsafe_base64_encode(
+            f'{timezone.now().isoformat()} {2 ** 70}'.encode()
+        )
+        first_page = list(
+            Post.objects.order_by('-pub_date', '-pk')[:EXPECTED_POSTS_NUMBER]
+        )
+
+        for direction in ('after', 'before'):
+            with self.subTest(direction=direction):
+                response = self.guest_client.get('/', {direction: token})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    list(response.context['page_obj']), first_page
+                )
+
+    def test_cursor_with_naive_date_is_broken(self):
+        """Cursor with a date without a time zone gives page one."""
+        token = urlsafe_base64_encode(
+            f'{timezone.now().replace(tzinfo=None).isoformat()} 1'.encode()
+        )
+
+        with warnings.catch_warnings():
+            # Naive dates reaching the database only give a warning.
+            warnings.simplefilter('error', RuntimeWarning)
+            self.assertBrokenCursor(token)
+
+    def test_cursor_with_date_out_of_utc_range_is_broken(self):
+        """Cursor with a date which has no UTC value gives page one."""
+        for value in (
+            '0001-01-01T00:00:00+05:00', '9999-12-31T23:59:59-05:00'
+        ):
+            with self.subTest(value=value):
+                self.assertBrokenCursor(
+                    urlsafe_base64_encode(f'{value} 1'.encode())
+                )
+
+    def assertBrokenCursor(self, token):
+        first_page = list(
+            Post.objects.order_by('-pub_date', '-pk')[:EXPECTED_POSTS_NUMBER]
+        )
+
+        for address in (
+            '/', '/group/some-slug/', '/profile/HasNoName/', '/follow/'
+        ):
+            for direction in ('after', 'before'):
+                with self.subTest(address=address, direction=direction):
+                    response = self.authorized_client_not_author.get(
+                        address, {direction: token}
+                    )
+
+                    self.assertEqual(response.status_code, 200)
+                    if address != '/follow/':
+                        self.assertEqual(
+                            list(response.context['page_obj']), first_page
+                        )
+
+    def test_cursor_page_before_returns_newer_posts(self):
+        """Going back from a cursor page gives the page it came from."""
+        first_page = self.guest_client.get(
+            '/', {'after': ''}
+        ).context['page_obj']
+        second_page = self.guest_client.get(
+            '/', {'after': first_page.next_cursor}
+        ).context['page_obj']
+        back_page = self.guest_client.get(
+            '/', {'before': second_page.previous_cursor}
+        ).context['page_obj']
+
+        self.assertEqual(
+            len(second_page), EXPECTED_POSTS_NUMBER_ON_SECOND_PAGE
+        )
+        self.assertTrue(second_page.has_previous())
+        self.assertEqual(list(back_page), list(first_page))
+
+    def test_cursor_pages_on_both_sides_are_cached_apart(self):
+        """Pages before and after the same cursor are not mixed in cache."""
+        posts = list(Post.objects.order_by('-pub_date', '-pk'))
+        token = encode_cursor(posts[12])
+
+        self.guest_client.get('/', {'after': token})
+        response = self.guest_client.get('/', {'before': token})
+
+        self.assertContains(
+            response, reverse('posts:post_detail', args=[posts[2].pk])
+        )
+        self.assertNotContains(
+            response, reverse('posts:post_detail', args=[posts[13].pk])
+        )
+
+    def test_broken_cursor_gives_first_page(self):
+        """Broken cursor shows the newest posts."""
+        page_obj = self.guest_client.get(
+            '/', {'after': 'broken'}
+        ).context['page_obj']
+
+        self.assertEqual(len(page_obj), EXPECTED_POSTS_NUMBER)
+        self.assertFalse(page_obj.has_previous())
+
+    @mock.patch('posts.utils.NUMBERED_PAGES', 1)
+    def test_deep_numbered_page_leads_to_cursor(self):
+        """Numbered pages past NUMBERED_PAGES link to a cursor page."""
+        page_obj = self.guest_client.get('/').context['page_obj']
+        next_page = self.guest_client.get(
+            '/', {'after': page_obj.next_cursor}
+        ).context['page_obj']
+
+        self.assertEqual(
+            len(next_page), EXPECTED_POSTS_NUMBER_ON_SECOND_PAGE
+        )
+        self.assertNotIn(page_obj[0], next_page)
@@ -0,0 +1,216 @@
+"""
+Follow feeds merged on read from cached timelines of the authors.
+
+Timeline of an author is an array of the newest published posts as
+interleaved pairs of the publication time in microseconds and the id,
+newest first. A feed page merges the timelines of the followed authors
+with heapq and loads the posts of the page with one in_bulk query.
+"""
+import heapq
+from array import array
+from datetime import datetime, timedelta
+from itertools import dropwhile, islice, takewhile
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Post
+from .pagination import AFTER, BEFORE, CursorPage, decode_cursor
+
+TIMELINE_KEY: str = 'feed:timeline:{pk}'
+TIMELINE_LENGTH: int = 1000
+TIMELINE_TIMEOUT: int = 60 * 60
+EPOCH: datetime = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND: timedelta = timedelta(microseconds=1)
+
+Key = Tuple[int, int]
+
+
+def _key(author_id: int) -> str:
+    return TIMELINE_KEY.format(pk=author_id)
+
+
+def _length() -> int:
+    return getattr(settings, 'FEED_TIMELINE_LENGTH', TIMELINE_LENGTH)
+
+
+def post_key(pub_date: datetime, pk: int) -> Key:
+    """Sort key of the post in timelines."""
+    return (pub_date - EPOCH) // MICROSECOND, pk
+
+
+def key_date(key: Key) -> datetime:
+    """Publication time of the post with the key."""
+    return EPOCH + key[0] * MICROSECOND
+
+
+def _pairs(timeline: array) -> List[Key]:
+    return list(zip(timeline[0::2], timeline[1::2]))
+
+
+def _pack(pairs: Sequence[Key]) -> bytes:
+    return array('q', [value for pair in pairs for value in pair]).tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    timeline = array('q')
+    timeline.frombytes(data)
+    return timeline
+
+
+def _load(author_id: int) -> List[Key]:
+    return [
+        post_key(pub_date, pk)
+        for pub_date, pk in Post.objects.published().filter(
+            author_id=author_id
+        ).order_by('-pub_date', '-pk').values_list(
+            'pub_date', 'pk'
+        )[:_length()]
+    ]
+
+
+def get_timelines(author_ids: List[int]) -> List[List[Key]]:
+    """Timelines of the authors, loading the ones missing in the cache."""
+    keys: Dict[str, int] = {_key(author_id): author_id
+                            for author_id in author_ids}
+    cached: Dict[str, bytes] = cache.get_many(keys)
+    timelines: List[List[Key]] = [
+        _pairs(_unpack(data)) for data in cached.values()
+    ]
+
+    # Each timeline is cut to its own length, so authors load one by one.
+    loaded: Dict[str, bytes] = {}
+    for key, author_id in keys.items():
+        if key not in cached:
+            pairs: List[Key] = _load(author_id)
+            loaded[key] = _pack(pairs)
+            timelines.append(pairs)
+    if loaded:
+        cache.set_many(loaded, TIMELINE_TIMEOUT)
+
+    return timelines
+
+
+def update_timeline(author_id: int, removed: Optional[Key] = None,
+                    added: Optional[Key] = None) -> None:
+    """
+    Move the post in the cached timeline of the author.
+
+    Timelines not in the cache are loaded on the next read. Concurrent
+    updates may lose one another, the timeout bounds how long for.
+    """
+    data: Optional[bytes] = cache.get(_key(author_id))
+    if data is None:
+        return
+
+    pairs: List[Key] = _pairs(_unpack(data))
+    if removed in pairs:
+        pairs.remove(removed)
+    if added is not None and added not in pairs:
+        pairs.append(added)
+        pairs.sort(reverse=True)
+        del pairs[_length():]
+
+    cache.set(_key(author_id), _pack(pairs), TIMELINE_TIMEOUT)
+
+
+class Timeline(Sequence):
+    """
+    Newest first published posts of several authors.
+
+    Posts are merged from the cached timelines only as far as the slice
+    asks for, so a page never builds the whole feed.
+    """
+
+    def __init__(self, timelines: List[List[Key]]):
+        self._timelines = timelines
+
+    def __len__(self) -> int:
+        return sum(len(timeline) for timeline in self._timelines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.hydrate(list(
+                islice(self.older(), index.start, index.stop, index.step)
+            ))
+
+        posts: List[Post] = self[index:index + 1]
+        if not posts:
+            raise IndexError(index)
+        return posts[0]
+
+    def older(self, cursor: Optional[Key] = None) -> Iterator[Key]:
+        """Keys older than the cursor, newest first."""
+        return heapq.merge(
+            *(
+                timeline if cursor is None
+                else dropwhile(lambda key: key >= cursor, timeline)
+                for timeline in self._timelines
+            ),
+            reverse=True
+        )
+
+    def newer(self, cursor: Key) -> Iterator[Key]:
+        """Keys newer than the cursor, oldest first."""
+        return heapq.merge(*(
+            reversed(list(takewhile(lambda key: key > cursor, timeline)))
+            for timeline in self._timelines
+        ))
+
+    @staticmethod
+    def hydrate(keys: List[Key]) -> List[Post]:
+        """Posts of the keys in their order, skipping the gone ones."""
+        posts: Dict[int, Post] = Post.objects.select_related(
+            'author', 'group'
+        ).published().in_bulk([pk for _, pk in keys])
+
+        return [posts[pk] for _, pk in keys if pk in posts]
+
+
+class TimelinePaginator:
+    """Split the merged timeline into pages by the last seen post."""
+
+    def __init__(self, object_list: Timeline, per_page: int):
+        self.object_list = object_list
+        self.per_page = per_page
+
+    def _cursor(self, token: Optional[str]) -> Optional[Key]:
+        cursor = decode_cursor(token)
+        return post_key(*cursor) if cursor is not None else None
+
+    def get_page(self, after: Optional[str] = None,
+                 before: Optional[str] = None) -> CursorPage:
+        """Same pages as CursorPaginator.get_page() gives for a queryset."""
+        after_cursor: Optional[Key] = self._cursor(after)
+        before_cursor: Optional[Key] = self._cursor(before)
+
+        if before_cursor is not None:
+            keys: List[Key] = list(islice(
+                self.object_list.newer(before_cursor), self.per_page + 1
+            ))
+            if len(keys) > self.per_page:
+                keys = keys[:self.per_page][::-1]
+                has_next: bool = next(
+                    self.object_list.older(keys[-1]), None
+                ) is not None
+                return CursorPage(
+                    self.object_list.hydrate(keys), before, BEFORE, True,
+                    has_next, 'pub_date'
+                )
+            after_cursor = None
+
+        keys = list(islice(
+            self.object_list.older(after_cursor), self.per_page + 1
+        ))
+        has_next = len(keys) > self.per_page
+        keys = keys[:self.per_page]
+        has_previous: bool = after_cursor is not None and bool(keys) and (
+            next(self.object_list.newer(keys[0]), None) is not None
+        )
+
+        return CursorPage(
+            self.object_list.hydrate(keys), after if after_cursor else '',
+            AFTER, has_previous, has_next, 'pub_date'
+        )
@@ -1,21 +1,116 @@
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from difflib import SequenceMatcher
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple
 
-import nltk
-import pymorphy2
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.paginator import Paginator
-from nltk.stem.snowball import SnowballStemmer
-from nltk.tokenize import word_tokenize
 
-nltk.download('punkt')
+from .pagination import (AFTER, BEFORE, CountedPaginator, CursorPaginator,
+                         encode_cursor)
 
+# Links, words with inner hyphens or apostrophes, or punctuation marks.
+TOKEN_RE = re.compile(
+    r"(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)\]]"
+    r"|\w+(?:[-'’]\w+)*|[^\w\s]"
+)
+URL_RE = re.compile(r'(?:https?://|www\.)', re.IGNORECASE)
+CYRILLIC_RE = re.compile('[а-яё]', re.IGNORECASE)
+LATIN_RE = re.compile('[a-z]', re.IGNORECASE)
+TOKEN_CYRILLIC: str = 'cyrillic'
+TOKEN_LATIN: str = 'latin'
+TOKEN_OTHER: str = 'other'
+LEMMA_CACHE_SIZE: int = 10000
+MIN_INFIX_LENGTH: int = 5
+NUMBERED_PAGES: int = 10
 
-def get_paginator(request, posts, posts_per_page):
-    """Get page_obj via paginator."""
-    paginator = Paginator(posts, posts_per_page)
+_nlp_lock = threading.Lock()
+_morph = None
+_stemmer = None
+_english_stemmer = None
+_normalize_word = None
+_timings = threading.local()
+
+
+class CallTimings:
+    """Wall time in seconds and counters of censor stages in one call."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+
+@contextmanager
+def collect_timings():
+    """Collect stages of the censor run in this thread into CallTimings."""
+    timings = CallTimings()
+    previous = getattr(_timings, 'current', None)
+    _timings.current = timings
+
+    try:
+        yield timings
+    finally:
+        _timings.current = previous
+
+
+@contextmanager
+def stage(name: str):
+    """Add wall time of the block to the collected stage."""
+    timings = getattr(_timings, 'current', None)
+
+    if timings is None:
+        yield
+        return
+
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.stages[name] += time.perf_counter() - start
+
+
+def count(name: str, value: int) -> None:
+    """Add value to the collected counter."""
+    timings = getattr(_timings, 'current', None)
+
+    if timings is not None:
+        timings.counts[name] += value
+
+
+def get_paginator(request, posts, posts_per_page, count_provider=None,
+                  cursor_paginator=CursorPaginator):
+    """
+    Get page_obj via paginator.
+
+    Requests with a cursor get a CursorPage of cursor_paginator instead.
+    Numbered pages lead to cursors after NUMBERED_PAGES, as deeper
+    offsets get slower. Number of posts is taken from count_provider
+    instead of COUNT.
+    """
+    if AFTER in request.GET or BEFORE in request.GET:
+        return cursor_paginator(posts, posts_per_page).get_page(
+            after=request.GET.get(AFTER),
+            before=request.GET.get(BEFORE),
+        )
+
+    if count_provider is None:
+        paginator = Paginator(posts, posts_per_page)
+    else:
+        paginator = CountedPaginator(posts, posts_per_page, count_provider)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
+    # A page is empty when the cached count is ahead of the rows.
+    if (page_obj.number >= NUMBERED_PAGES and page_obj.has_next()
+            and page_obj.object_list):
+        page_obj.next_cursor = encode_cursor(page_obj[len(page_obj) - 1])
+
     return page_obj
 
 
@@ -35,52 +130,608 @@ def join_punctuation(seq: List[str], characters: str = '.,;?!') -> str:
     yield current
 
 
+def word_tokenize(text: str) -> List[str]:
+    """Split text into words and punctuation marks."""
+    return TOKEN_RE.findall(text)
+
+
+def mask_spans(text: str, spans: Iterable[Tuple[int, int]],
+               mask: str = '*') -> str:
+    """Replace characters of sorted spans with asterisks."""
+    parts: List[str] = []
+    position: int = 0
+
+    for start, end in spans:
+        parts.append(text[position:start])
+        parts.append(mask * (end - start))
+        position = end
+
+    parts.append(text[position:])
+
+    return ''.join(parts)
+
+
+def get_morph_analyzer():
+    """Return the process-wide morphological analyzer."""
+    global _morph
+
+    if _morph is None:
+        with _nlp_lock:
+            if _morph is None:
+                # Dictionaries are loaded on the first check, not at boot.
+                import pymorphy2
+                _morph = pymorphy2.MorphAnalyzer()
+
+    return _morph
+
+
+def get_stemmer():
+    """Return the process-wide russian stemmer."""
+    global _stemmer
+
+    if _stemmer is None:
+        with _nlp_lock:
+            if _stemmer is None:
+                from nltk.stem.snowball import SnowballStemmer
+                _stemmer = SnowballStemmer("russian")
+
+    return _stemmer
+
+
+def get_english_stemmer():
+    """Return the process-wide english stemmer."""
+    global _english_stemmer
+
+    if _english_stemmer is None:
+        with _nlp_lock:
+            if _english_stemmer is None:
+                from nltk.stem.snowball import SnowballStemmer
+                _english_stemmer = SnowballStemmer("english")
+
+    return _english_stemmer
+
+
+def classify_token(token: str) -> str:
+    """Tell russian words from other words, numbers, links and marks."""
+    if URL_RE.match(token):
+        return TOKEN_OTHER
+    if CYRILLIC_RE.search(token):
+        return TOKEN_CYRILLIC
+    if LATIN_RE.search(token):
+        return TOKEN_LATIN
+
+    return TOKEN_OTHER
+
+
+def _parse_word(word: str) -> Tuple[str, str]:
+    with stage('lemmatize'):
+        normal_form: str = get_morph_analyzer().parse(word)[0].normal_form
+
+    with stage('stem'):
+        return normal_form, get_stemmer().stem(normal_form)
+
+
+def normalize_word(word: str) -> Tuple[str, str]:
+    """Get normal form and stem of the word by its script."""
+    kind: str = classify_token(word)
+    word = word.lower()
+
+    if kind == TOKEN_CYRILLIC:
+        return _normalize_russian_word(word)
+
+    if kind == TOKEN_LATIN and getattr(
+            settings, 'CENSOR_ENGLISH_STEMMER', False):
+        return word, get_english_stemmer().stem(word)
+
+    # Numbers, links and marks are compared as they are.
+    return word, word
+
+
+def _normalize_russian_word(word: str) -> Tuple[str, str]:
+    """Get normal form and stem of the word through the LRU cache."""
+    global _normalize_word
+
+    if _normalize_word is None:
+        with _nlp_lock:
+            if _normalize_word is None:
+                maxsize: int = getattr(
+                    settings, 'CENSOR_LEMMA_CACHE_SIZE', LEMMA_CACHE_SIZE
+                )
+                _normalize_word = lru_cache(maxsize=maxsize)(_parse_word)
+
+    # The analyzer ignores case, so one cache entry serves all spellings.
+    return _normalize_word(word)
+
+
+def lemma_cache_info():
+    """Hits, misses and size of the normal form cache."""
+    if _normalize_word is None:
+        return None
+
+    return _normalize_word.cache_info()
+
+
+def inflect_word(word: str) -> List[Tuple[str, str]]:
+    """Get all inflected forms of the word with their common stem."""
+    stem: str = normalize_word(word)[1]
+    forms = dict.fromkeys(
+        form.word for form in get_morph_analyzer().parse(word)[0].lexeme
+    )
+    # People rarely type "ё", so spelling with "е" is a form too.
+    forms.update(dict.fromkeys(form.replace('ё', 'е') for form in forms))
+
+    return [(form, stem) for form in forms]
+
+
 def lemmatize_words(tokenized_words: List[str]) -> List[str]:
     """Lemmatize words."""
-    morph = pymorphy2.MorphAnalyzer()
-    result = [morph.parse(word)[0].normal_form for word in tokenized_words]
+    result = [normalize_word(word)[0] for word in tokenized_words]
 
     return result
 
 
 def stemmatize_words(tokenized_words: List[str]) -> List[str]:
     """Stemmatize words."""
-    snowball = SnowballStemmer("russian")
+    snowball = get_stemmer()
     result = [snowball.stem(word) for word in tokenized_words]
 
     return result
 
 
-def bad_language_validation(text: str, stop_words: List[str],
-                            similarity_threshold: float) -> Tuple[str, bool]:
-    """Check if text contains bad words and replace it with asterisks."""
-    bad_words_idx: int = []
-    validation_error: bool = False
-    tokenized_words: List[str] = word_tokenize(text)
+def normalize_words(tokenized_words: List[str]) -> List[str]:
+    """Get stems of lemmatized words."""
+    result = [normalize_word(word)[1] for word in tokenized_words]
+
+    return result
+
+
+def _chars(word: str) -> List[Tuple[str, int]]:
+    """Character multiset as a set of (character, occurrence) pairs."""
+    return [
+        (char, occurrence)
+        for char, count in Counter(word).items()
+        for occurrence in range(count)
+    ]
+
+
+class FuzzyIndex:
+    """
+    Character index over stop stems for SequenceMatcher.quick_ratio().
+
+    quick_ratio() is 2 * M / (len(a) + len(b)), where M is the size of the
+    characters multiset intersection, so the pair can pass the threshold
+    only if M > threshold * len / (2 - threshold) for both words. Two such
+    words always share one of their rarest characters, hence only those
+    are indexed and probed. Since M is at most the shorter length, stems
+    are also grouped by length, and the candidates are checked exactly.
+    """
+
+    def __init__(self, stems: Iterable[str], similarity_threshold: float):
+        self.similarity_threshold = similarity_threshold
+        stems = list(stems)
+        self._stems: List[Counter] = [Counter(stem) for stem in stems]
+        self._lengths: List[int] = [len(stem) for stem in stems]
+        self._max_length: int = max(self._lengths, default=0)
+        stems_chars = [_chars(stem) for stem in stems]
+        self._frequency = Counter(
+            char for stem_chars in stems_chars for char in stem_chars
+        )
+        self._index: Dict[Tuple[str, int], Dict[int, List[int]]] = (
+            defaultdict(lambda: defaultdict(list))
+        )
 
-    lemmatized_words: List[str] = lemmatize_words(tokenized_words)
-    lemmatized_stop_words: List[str] = lemmatize_words(stop_words)
+        for i, stem_chars in enumerate(stems_chars):
+            for char in self._prefix(stem_chars):
+                self._index[char][len(stem_chars)].append(i)
 
-    stemmed_stop_words: List[str] = stemmatize_words(lemmatized_stop_words)
-    stemmed_words: List[str] = stemmatize_words(lemmatized_words)
+    def _prefix(self, chars: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        threshold: float = self.similarity_threshold
+        min_overlap: int = int(
+            threshold * len(chars) / (2 - threshold) - 1e-9
+        ) + 1
+        chars = sorted(
+            chars,
+            key=lambda char: (self._frequency.get(char, 0), char)
+        )
 
-    for i in range(len(stemmed_words)):
-        if stemmed_words[i] in stemmed_stop_words:
-            bad_words_idx.append(i)
-            validation_error = True
-            continue
+        return chars[:max(len(chars) - min_overlap + 1, 0)]
 
-        for stop_word in stemmed_stop_words:
-            s = SequenceMatcher(None, stop_word, stemmed_words[i])
-            if s.quick_ratio() > similarity_threshold:
-                bad_words_idx.append(i)
-                validation_error = True
+    def _lengths_range(self, length: int) -> range:
+        """Lengths of stems which can be similar to a word of length."""
+        threshold: float = self.similarity_threshold
+        shortest: int = int(threshold * length / (2 - threshold) - 1e-9)
+        longest: int = self._max_length
 
-    bad_words_idx = set(bad_words_idx)
+        if threshold > 0:
+            longest = min(
+                int(length * (2 - threshold) / threshold + 1e-9) + 1,
+                longest
+            )
 
-    for i in bad_words_idx:
-        tokenized_words[i] = '*' * len(tokenized_words[i])
+        return range(max(shortest, 0), longest + 1)
 
-    result: str = ' '.join(join_punctuation(tokenized_words))
+    def is_similar(self, word: str) -> bool:
+        """Check if quick_ratio() of word and any stem exceeds threshold."""
+        word_chars = Counter(word)
+        lengths: range = self._lengths_range(len(word))
+        candidates = set()
+
+        for char in self._prefix(_chars(word)):
+            postings = self._index.get(char)
+            if postings is None:
+                continue
+            for length in lengths:
+                candidates.update(postings.get(length, ()))
+
+        for i in candidates:
+            stem: Counter = self._stems[i]
+            matches: int = sum((word_chars & stem).values())
+            length: int = len(word) + self._lengths[i]
+            if 2.0 * matches / length > self.similarity_threshold:
+                return True
+
+        return False
+
+    def find_similar(self, words: List[str]) -> List[bool]:
+        """Check every word with is_similar()."""
+        return [self.is_similar(word) for word in words]
+
+
+class VectorFuzzyIndex:
+    """
+    SequenceMatcher.quick_ratio() of all words and stems with NumPy.
+
+    Words and stems are turned into matrices of character counts, and the
+    multiset intersection of every pair is summed from the element-wise
+    minimum of their counts, one character column at a time.
+    """
+
+    # Upper bound of words times stems compared in one step.
+    MAX_PAIRS: int = 2 ** 22
+
+    def __init__(self, stems: Iterable[str], similarity_threshold: float):
+        try:
+            import numpy
+        except ImportError:
+            raise ImproperlyConfigured(
+                'NumPy is required for the "numpy" fuzzy engine.'
+            )
+
+        self._numpy = numpy
+        self.similarity_threshold = similarity_threshold
+        stems = list(stems)
+        self._alphabet: Dict[str, int] = {
+            char: i for i, char in enumerate(sorted(set(''.join(stems))))
+        }
+        self._stem_counts = self._count(stems)
+        self._stem_lengths = numpy.array(
+            [len(stem) for stem in stems], dtype=numpy.int32
+        )
+
+    def _count(self, words: List[str]):
+        counts = self._numpy.zeros(
+            (len(words), len(self._alphabet)), dtype=self._numpy.int32
+        )
+
+        for i, word in enumerate(words):
+            for char in word:
+                # Other characters only add to the length of the word.
+                j = self._alphabet.get(char)
+                if j is not None:
+                    counts[i, j] += 1
+
+        return counts
+
+    def find_similar(self, words: List[str]) -> List[bool]:
+        """Check if quick_ratio() of each word and any stem is above."""
+        numpy = self._numpy
+        result = numpy.zeros(len(words), dtype=bool)
+
+        if not words or not len(self._stem_lengths):
+            return result.tolist()
+
+        counts = self._count(words)
+        lengths = numpy.array([len(word) for word in words], numpy.int32)
+        step: int = max(self.MAX_PAIRS // len(self._stem_lengths), 1)
+
+        for start in range(0, len(words), step):
+            chunk = counts[start:start + step]
+            matches = numpy.zeros(
+                (len(chunk), len(self._stem_lengths)), dtype=numpy.int32
+            )
+            for j in numpy.flatnonzero(chunk.any(axis=0)):
+                matches += numpy.minimum.outer(
+                    chunk[:, j], self._stem_counts[:, j]
+                )
+            total = (
+                lengths[start:start + step, None] + self._stem_lengths
+            )
+            ratio = 2.0 * matches / total
+            result[start:start + step] = (
+                ratio > self.similarity_threshold
+            ).any(axis=1)
+
+        return result.tolist()
+
+    def is_similar(self, word: str) -> bool:
+        return self.find_similar([word])[0]
+
+
+FUZZY_ENGINES = {
+    'index': FuzzyIndex,
+    'numpy': VectorFuzzyIndex,
+}
+
+
+class StemAutomaton:
+    """
+    Aho-Corasick automaton over stop stems and stop phrases.
+
+    Stems of the text are scanned in one pass as a space separated string.
+    A match aligned on token borders marks every token of the phrase;
+    a single stop stem of at least min_infix_length characters found
+    inside a longer token marks that compound token too.
+    """
+
+    SEPARATOR: str = ' '
+
+    def __init__(self, phrases: Iterable[Sequence[str]],
+                 min_infix_length: int = MIN_INFIX_LENGTH):
+        self.min_infix_length = min_infix_length
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        # Length in characters and number of words of every pattern.
+        self._patterns: List[Tuple[int, int]] = []
+        self.max_words: int = 1
+
+        patterns = dict.fromkeys(
+            self.SEPARATOR.join(phrase) for phrase in phrases if phrase
+        )
+        for pattern in patterns:
+            self._add(pattern)
+
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        state: int = 0
+
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+
+        words: int = pattern.count(self.SEPARATOR) + 1
+        self._output[state].append(len(self._patterns))
+        self._patterns.append((len(pattern), words))
+        self.max_words = max(self.max_words, words)
+
+    def _build(self) -> None:
+        queue: List[int] = list(self._goto[0].values())
+
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail: int = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = (
+                    self._output[next_state]
+                    + self._output[self._fail[next_state]]
+                )
+                queue.append(next_state)
+
+    def _scan(self, text: str) -> Iterable[Tuple[int, int]]:
+        """Yield start and end of every pattern occurrence."""
+        state: int = 0
+
+        for position, char in enumerate(text, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern in self._output[state]:
+                yield position - self._patterns[pattern][0], position
+
+    def find(self, stemmed_words: List[str]) -> Set[int]:
+        """Return indexes of words covered by stop stems and phrases."""
+        text: str = self.SEPARATOR.join(stemmed_words)
+        starts: List[int] = []
+        position: int = 0
+
+        for word in stemmed_words:
+            starts.append(position)
+            position += len(word) + len(self.SEPARATOR)
+
+        bad_words_idx: Set[int] = set()
+
+        for start, end in self._scan(text):
+            first: int = bisect_right(starts, start) - 1
+            last: int = bisect_right(starts, end - 1) - 1
+            is_whole: bool = (
+                starts[first] == start
+                and end == starts[last] + len(stemmed_words[last])
+            )
+            if is_whole:
+                bad_words_idx.update(range(first, last + 1))
+            elif (first == last and self.min_infix_length
+                  and end - start >= self.min_infix_length):
+                bad_words_idx.add(first)
+
+        return bad_words_idx
+
+
+class CensorMatcher:
+    """Stop list normalized once and reused for every checked text."""
+
+    def __init__(self, stop_words: Iterable[str],
+                 similarity_threshold: float,
+                 min_infix_length: int = MIN_INFIX_LENGTH,
+                 word_forms: Iterable[Tuple[str, str]] = (),
+                 fuzzy_engine: str = 'index'):
+        self._compile(
+            [
+                normalize_words(word_tokenize(stop_word))
+                for stop_word in stop_words
+            ],
+            similarity_threshold, min_infix_length, word_forms, fuzzy_engine
+        )
+
+    @classmethod
+    def from_stop_phrases(cls, stop_phrases: Iterable[Sequence[str]],
+                          similarity_threshold: float,
+                          min_infix_length: int = MIN_INFIX_LENGTH,
+                          word_forms: Iterable[Tuple[str, str]] = (),
+                          fuzzy_engine: str = 'index') -> 'CensorMatcher':
+        """Build the matcher from stop words normalized beforehand."""
+        matcher = cls.__new__(cls)
+        matcher._compile(
+            list(stop_phrases), similarity_threshold, min_infix_length,
+            word_forms, fuzzy_engine
+        )
+
+        return matcher
+
+    def _compile(self, stop_phrases: List[Sequence[str]],
+                 similarity_threshold: float, min_infix_length: int,
+                 word_forms: Iterable[Tuple[str, str]],
+                 fuzzy_engine: str) -> None:
+        self.similarity_threshold = similarity_threshold
+        # Precomputed inflected forms of stop words mapped to their stems,
+        # a mapping is kept as it is, so it can live in a shared file.
+        self._word_forms: Mapping[str, str] = (
+            word_forms if isinstance(word_forms, Mapping)
+            else dict(word_forms)
+        )
+        self.stop_phrases: List[Sequence[str]] = stop_phrases
+        # Duplicates never change the verdict, so keep one stem of each.
+        self.stop_stems: List[str] = list(dict.fromkeys(
+            phrase[0] for phrase in stop_phrases if len(phrase) == 1
+        ))
+        self.stop_words_count: int = len(stop_phrases)
+        self._automaton = StemAutomaton(stop_phrases, min_infix_length)
+        self._fuzzy_index = FUZZY_ENGINES[fuzzy_engine](
+            self.stop_stems, similarity_threshold
+        )
+
+    def _stem_words(self, words: List[str]
+                    ) -> Tuple[List[str], Set[int], Set[int]]:
+        """
+        Stems of the words, indexes of known forms of stop words and
+        indexes of numbers, links and marks not checked for similarity.
+        """
+        known_idx: Set[int] = set()
+        skipped_idx: Set[int] = set()
+        stemmed_words: List[str] = []
+
+        for i, word in enumerate(words):
+            stem = self._word_forms.get(word.lower())
+            if stem is not None:
+                known_idx.add(i)
+            else:
+                stem = normalize_word(word)[1]
+                if classify_token(word) == TOKEN_OTHER:
+                    skipped_idx.add(i)
+            stemmed_words.append(stem)
+
+        return stemmed_words, known_idx, skipped_idx
+
+    def find_bad_words_many(self,
+                            texts_words: List[List[str]]) -> List[List[int]]:
+        """Return indexes of bad words for each of many tokenized texts."""
+        found: List[Set[int]] = []
+        # Stems left for the fuzzy check with their text and word indexes.
+        unmatched: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for text_idx, words in enumerate(texts_words):
+            count('tokens', len(words))
+            with stage('normalize'):
+                stemmed_words, bad_words_idx, skipped_idx = (
+                    self._stem_words(words)
+                )
+            with stage('match'):
+                bad_words_idx.update(self._automaton.find(stemmed_words))
+            found.append(bad_words_idx)
+            for i, stemmed_word in enumerate(stemmed_words):
+                if i not in bad_words_idx and i not in skipped_idx:
+                    unmatched[stemmed_word].append((text_idx, i))
+
+        with stage('fuzzy'):
+            similar: List[bool] = self._fuzzy_index.find_similar(
+                list(unmatched)
+            )
+
+        for positions, is_similar in zip(unmatched.values(), similar):
+            if is_similar:
+                for text_idx, i in positions:
+                    found[text_idx].add(i)
+
+        return [sorted(bad_words_idx) for bad_words_idx in found]
+
+    def find_bad_words(self, tokenized_words: List[str]) -> List[int]:
+        """Return indexes of words that match the stop list."""
+        return self.find_bad_words_many([tokenized_words])[0]
+
+    def find_bad_spans_many(self,
+                            texts: List[str]) -> List[List[Tuple[int, int]]]:
+        """Return offsets of bad words for each text, checked at once."""
+        with stage('tokenize'):
+            texts_tokens = [list(TOKEN_RE.finditer(text)) for text in texts]
+        found: List[List[int]] = self.find_bad_words_many(
+            [[token.group() for token in tokens] for tokens in texts_tokens]
+        )
+
+        return [
+            [tokens[i].span() for i in bad_words_idx]
+            for tokens, bad_words_idx in zip(texts_tokens, found)
+        ]
+
+    def find_bad_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Return start and end offsets of bad words in the text."""
+        return self.find_bad_spans_many([text])[0]
+
+    def find_changed_bad_spans(self, clean_text: str,
+                               text: str) -> List[Tuple[int, int]]:
+        """
+        Return offsets of bad words in the text edited from clean_text.
+
+        Words kept from the clean text are known to be fine on their own,
+        so only changed words are checked, together with the neighbours
+        they can form a stop phrase with.
+        """
+        with stage('tokenize'):
+            tokens = list(TOKEN_RE.finditer(text))
+            words: List[str] = [token.group() for token in tokens]
+        context: int = self._automaton.max_words - 1
+        with stage('diff'):
+            opcodes = SequenceMatcher(
+                None, TOKEN_RE.findall(clean_text), words
+            ).get_opcodes()
+        bad_words_idx: Set[int] = set()
+
+        for tag, _, _, start, end in opcodes:
+            if tag == 'equal':
+                continue
+            first: int = max(start - context, 0)
+            bad_words_idx.update(
+                first + i
+                for i in self.find_bad_words(words[first:end + context])
+            )
+
+        return [tokens[i].span() for i in sorted(bad_words_idx)]
+
+    def validate(self, text: str) -> Tuple[str, bool]:
+        """Check if text contains bad words and replace it with asterisks."""
+        spans: List[Tuple[int, int]] = self.find_bad_spans(text)
+
+        return mask_spans(text, spans), bool(spans)
+
+
+def bad_language_validation(text: str, stop_words: Iterable[str],
+                            similarity_threshold: float) -> Tuple[str, bool]:
+    """Check if text contains bad words and replace it with asterisks."""
+    matcher = CensorMatcher(stop_words, similarity_threshold)
 
-    return result, validation_error
+    return matcher.validate(text)
@@ -1,8 +1,17 @@
+from functools import partial
+
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 
+from .counts import (SCOPE_ALL, SCOPE_AUTHOR, SCOPE_AUTHOR_ALL, SCOPE_GROUP,
+                     get_follow_count, get_post_count)
+from .feed import ENGINE_PULL, get_engine, get_feed
+from .follows import following_ids, is_following
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .moderation import save_for_moderation
+from .timelines import Timeline, TimelinePaginator, get_timelines
 from .utils import get_paginator
 
 POSTS_LIMIT: int = 10
@@ -10,8 +19,10 @@ POSTS_LIMIT: int = 10
 
 def index(request):
     """Main page."""
-    posts = Post.objects.select_related('author', 'group').all()
-    page_obj = get_paginator(request, posts, POSTS_LIMIT)
+    posts = Post.objects.select_related('author', 'group').published()
+    page_obj = get_paginator(
+        request, posts, POSTS_LIMIT, partial(get_post_count, SCOPE_ALL)
+    )
 
     context = {
         'page_obj': page_obj,
@@ -22,8 +33,11 @@ def index(request):
 def group_posts(request, slug):
     """Group posts page."""
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts_group.select_related('author').all()
-    page_obj = get_paginator(request, posts, POSTS_LIMIT)
+    posts = group.posts_group.select_related('author').published()
+    page_obj = get_paginator(
+        request, posts, POSTS_LIMIT,
+        partial(get_post_count, SCOPE_GROUP, group.pk)
+    )
 
     context = {
         'group': group,
@@ -34,13 +48,21 @@ def group_posts(request, slug):
 
 def profile(request, username):
     """Profile page."""
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
     posts = user.posts.select_related('group').all()
-    page_obj = get_paginator(request, posts, POSTS_LIMIT)
+    scope: str = SCOPE_AUTHOR_ALL
+    # Authors see their own posts waiting for the moderation.
+    if request.user != user:
+        posts = posts.published()
+        scope = SCOPE_AUTHOR
+    page_obj = get_paginator(
+        request, posts, POSTS_LIMIT, partial(get_post_count, scope, user.pk)
+    )
     following = (request.user != user
                  and request.user.is_authenticated
-                 and Follow.objects.filter(user=request.user, author=user,
-                                           ).exists()
+                 and is_following(request.user.pk, user.pk)
                  )
 
     context = {
@@ -53,10 +75,12 @@ def profile(request, username):
 
 def post_detail(request, post_id, form=None):
     post = get_object_or_404(
-        Post.objects.select_related('group', 'author'),
+        Post.objects.select_related('group', 'author__stats'),
         pk=post_id
     )
-    comments = post.comments.select_related('author')
+    if not post.is_published and post.author != request.user:
+        raise Http404
+    comments = post.comments.select_related('author').published()
 
     if not form:
         form = CommentForm()
@@ -82,7 +106,7 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        save_for_moderation(post)
 
         return redirect('posts:profile', post.author.username)
 
@@ -110,7 +134,7 @@ def post_edit(request, post_id):
     )
 
     if form.is_valid():
-        form.save()
+        save_for_moderation(form.save(commit=False))
         return redirect('posts:post_detail', post_id)
 
     context = {
@@ -124,16 +148,18 @@ def post_edit(request, post_id):
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(
-        Post.objects.select_related('group', 'author'),
+        Post.objects.select_related('group', 'author__stats'),
         pk=post_id
     )
+    if not post.is_published and post.author != request.user:
+        raise Http404
     form = CommentForm(request.POST or None)
 
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        save_for_moderation(comment)
 
         return redirect('posts:post_detail', post_id=post_id)
 
@@ -143,12 +169,21 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     """Page with author's posts."""
-    posts = Post.objects.select_related(
-        'author',
-        'group'
-    ).filter(author__following__user=request.user)
-
-    page_obj = get_paginator(request, posts, POSTS_LIMIT)
+    if get_engine() == ENGINE_PULL:
+        page_obj = get_paginator(
+            request,
+            Timeline(get_timelines(list(following_ids(request.user.pk)))),
+            POSTS_LIMIT,
+            cursor_paginator=TimelinePaginator
+        )
+    else:
+        page_obj = get_paginator(
+            request,
+            get_feed(request.user),
+            POSTS_LIMIT,
+            partial(get_follow_count, request.user),
+            cursor_paginator=TimelinePaginator
+        )
 
     context = {
         'page_obj': page_obj,
@@ -176,4 +211,4 @@ def profile_unfollow(request, username):
         user=request.user,
     ).delete()
 
-    return redirect("posts:profile", username=username)
\ No newline at end of file
+    return redirect("posts:profile", username=username)
@@ -146,3 +146,48 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Censor
+CENSOR_LEMMA_CACHE_SIZE = 10000
+CENSOR_MIN_INFIX_LENGTH = 5
+CENSOR_VERDICT_TIMEOUT = 60 * 60 * 24
+# Check texts by the moderation_worker command instead of the form
+CENSOR_DEFERRED = False
+# Failed checks of a text by the worker before it is left pending
+MODERATION_MAX_ATTEMPTS = 3
+# Seconds a worker holds a task before another worker may take it
+MODERATION_LEASE_TIMEOUT = 60 * 5
+# "index" or "numpy" (needs NumPy installed) for the fuzzy stop words check
+CENSOR_FUZZY_ENGINE = 'index'
+# Stem latin words with the english stemmer instead of lowercasing only
+CENSOR_ENGLISH_STEMMER = False
+# Seconds a process trusts its version of the stop list before reading
+# it from the database again, so changes reach all workers
+CENSOR_VERSION_TTL = 5
+# Censor calls slower than this are logged with per-stage timings
+CENSOR_SLOW_CALL_MS = 200
+# Load the censor in yatube/wsgi.py before the server forks workers
+CENSOR_WARM_UP = True
+# Compiled stop list shared by all processes, see build_censor_index
+CENSOR_INDEX_PATH = os.path.join(BASE_DIR, 'censor.index')
+
+# Post counts
+# Cached numbers of posts are recounted after this many seconds
+POSTS_COUNT_TIMEOUT = 60 * 10
+# Above this many rows in PostgreSQL the planner estimate is used instead
+POSTS_COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Follow feeds
+# Posts of authors with more followers are pulled on read, not copied
+FEED_FANOUT_LIMIT = 1000
+# Follow page reads the feed table ('fanout') or merges cached timelines
+# of the followed authors ('pull'). Only the chosen one is kept up to date,
+# run rebuild_feeds after switching back to 'fanout'. 'pull' needs the
+# default cache shared by all processes, such as memcached
+FEED_ENGINE = 'fanout'
+# Newest posts of an author kept in the cached timeline
+FEED_TIMELINE_LENGTH = 1000
+# Seconds the cached follow graph and numbers of followers are trusted.
+# Processes with their own LocMemCache see the follows made in the others
+# after it, it may be raised with a cache shared by all processes
+FOLLOWS_GRAPH_TIMEOUT = 5
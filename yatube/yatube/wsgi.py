@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Loaded once here, workers of a preloading server share the pages.
+from posts.censor import warm_up  # noqa: E402
+
+warm_up()